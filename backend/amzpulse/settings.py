@@ -124,6 +124,9 @@ REST_FRAMEWORK = {
 # Clerk Configuration
 CLERK_SECRET_KEY = config('CLERK_SECRET_KEY', default='')
 CLERK_PEM_PUBLIC_KEY = config('CLERK_PEM_PUBLIC_KEY', default='')
+# JWKS endpoint (https://<frontend-api>/.well-known/jwks.json), used when no
+# static PEM key is configured so rotated signing keys are picked up
+CLERK_JWKS_URL = config('CLERK_JWKS_URL', default='')
 CLERK_ISSUER = config('CLERK_ISSUER', default='')
 
 # AWS S3 Configuration
@@ -175,6 +178,11 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='AMZPulse <noreply@amz
 # Frontend URL for invite links
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
 
+# Re-read newly created tools and repair is_personal/created_by if they were stored wrong.
+# The pre_save handler in toollinks/signals.py (force_personal_tools_before_save) already
+# enforces this on every save, so the extra round-trips are off by default.
+TOOLLINK_POSTCREATE_VERIFY = config('TOOLLINK_POSTCREATE_VERIFY', default=False, cast=bool)
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
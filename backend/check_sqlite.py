@@ -9,10 +9,11 @@ if not os.path.exists(db_path):
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
-# Get all tables
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-tables = [t[0] for t in cursor.fetchall()]
-print(f"Tables found: {tables}")
+# Get all tables (as a set so the membership checks below are O(1))
+cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+table_names = [t[0] for t in cursor.fetchall()]
+tables = set(table_names)
+print(f"Tables found: {table_names}")
 print()
 
 # Check for tools
@@ -22,12 +23,12 @@ if 'tool_links' in tables:
     print(f"Tools in SQLite: {count}")
     
     if count > 0:
-        cursor.execute('SELECT * FROM tool_links LIMIT 10')
+        # Only the columns needed to eyeball the sample; the column names
+        # come straight from the cursor instead of a separate PRAGMA query.
+        cursor.execute('SELECT id, name, url, created_by_id FROM tool_links LIMIT 10')
         tools = cursor.fetchall()
         print(f"\nFound {len(tools)} tools. Sample:")
-        # Get column names
-        cursor.execute('PRAGMA table_info(tool_links)')
-        columns = [col[1] for col in cursor.fetchall()]
+        columns = [col[0] for col in cursor.description]
         print(f"Columns: {columns}")
         for tool in tools:
             print(f"  - {tool}")
@@ -9,30 +9,36 @@ if not os.path.exists(db_path):
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
+# Look up both tables in a single catalog probe
+cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('teams', 'team_members')")
+tables = {t[0] for t in cursor.fetchall()}
+
 # Check for teams
-if 'teams' in [t[0] for t in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]:
-    cursor.execute('SELECT COUNT(*) FROM teams')
-    count = cursor.fetchone()[0]
+if 'teams' in tables:
+    if 'team_members' in tables:
+        cursor.execute('SELECT (SELECT COUNT(*) FROM teams), (SELECT COUNT(*) FROM team_members)')
+        count, member_count = cursor.fetchone()
+    else:
+        cursor.execute('SELECT COUNT(*) FROM teams')
+        count, member_count = cursor.fetchone()[0], 0
     print(f"Teams in SQLite: {count}")
     
     if count > 0:
-        cursor.execute('SELECT id, name, description, created_by_id, created_at FROM teams')
+        cursor.execute('SELECT id, name, created_by_id FROM teams')
         teams = cursor.fetchall()
         print("\nTeams found:")
         for team in teams:
-            print(f"  - ID: {team[0]}, Name: {team[1]}, Created by: {team[3]}")
+            print(f"  - ID: {team[0]}, Name: {team[1]}, Created by: {team[2]}")
         
         # Check team members
-        cursor.execute('SELECT COUNT(*) FROM team_members')
-        member_count = cursor.fetchone()[0]
         print(f"\nTeam members in SQLite: {member_count}")
         
         if member_count > 0:
-            cursor.execute('SELECT id, team_id, user_id, role FROM team_members LIMIT 10')
+            cursor.execute('SELECT team_id, user_id, role FROM team_members LIMIT 10')
             members = cursor.fetchall()
             print("Sample members:")
             for member in members:
-                print(f"  - Team ID: {member[1]}, User ID: {member[2]}, Role: {member[3]}")
+                print(f"  - Team ID: {member[0]}, User ID: {member[1]}, Role: {member[2]}")
 else:
     print("teams table not found!")
 
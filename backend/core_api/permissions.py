@@ -1,7 +1,9 @@
 """
 Shared permission classes for the application.
 """
+from django.conf import settings
 from rest_framework import permissions
+from .utils import get_request_admin_status
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,9 +17,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        if not request.user or not request.user.is_authenticated:
-            return False
-        return request.user.is_admin or request.user.is_superuser or request.user.is_staff
+        return get_request_admin_status(request)
 
 
 class IsAdminOrOwner(permissions.BasePermission):
@@ -25,6 +25,9 @@ class IsAdminOrOwner(permissions.BasePermission):
     Custom permission that allows admins to do anything,
     but regular users can only access their own resources.
     """
+    # model class -> name of the owner's FK id attribute (or None)
+    _owner_attrs = {}
+    
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
             return False
@@ -32,16 +35,33 @@ class IsAdminOrOwner(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # Admins can do anything
-        if request.user.is_admin or request.user.is_superuser or request.user.is_staff:
+        if get_request_admin_status(request):
             return True
         
         # Check if user owns the object
-        if hasattr(obj, 'created_by'):
-            return obj.created_by_id == request.user.id
-        if hasattr(obj, 'user'):
-            return obj.user_id == request.user.id
-        
-        return False
+        owner_attr = self._get_owner_attr(type(obj))
+        if owner_attr is None:
+            return False
+        return getattr(obj, owner_attr) == request.user.id
+    
+    @classmethod
+    def _get_owner_attr(cls, model_class):
+        """
+        Resolve which FK id column identifies the owner of a model, caching the
+        answer per model class. Views are instantiated per request, so the
+        cache lives on the permission class rather than on the view.
+        """
+        try:
+            return cls._owner_attrs[model_class]
+        except KeyError:
+            pass
+        owner_attr = None
+        for attr in ('created_by_id', 'user_id'):
+            if hasattr(model_class, attr):
+                owner_attr = attr
+                break
+        cls._owner_attrs[model_class] = owner_attr
+        return owner_attr
 
 
 class IsAuthenticatedOrReadOnlyInDebug(permissions.BasePermission):
@@ -50,8 +70,6 @@ class IsAuthenticatedOrReadOnlyInDebug(permissions.BasePermission):
     Require authentication for write operations always.
     """
     def has_permission(self, request, view):
-        from django.conf import settings
-        
         if request.method in permissions.SAFE_METHODS:
             # Allow read access in DEBUG mode without auth
             if settings.DEBUG:
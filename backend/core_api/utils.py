@@ -1,14 +1,27 @@
 """
 Shared utility functions for the application.
 """
+import gzip
+import hashlib
 import logging
+import re
 from typing import Optional, Dict, Any
 from django.db import models
-from rest_framework.response import Response
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.pagination import PageNumberPagination
 from rest_framework import status
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+_HEX_COLOR_RE = re.compile(r'^#(?:[A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
+_DUPLICATE_ERROR_RE = re.compile(r'duplicate key|already exists', re.IGNORECASE)
+_FAILED_TO_CREATE_RE = re.compile(r'Failed to create(?P<rest>.*)', re.DOTALL)
+_ERROR_DETAIL_RE = re.compile(r"ErrorDetail\(string='([^']*)', code='[^']*'\)")
+_ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
 
 def get_user_admin_status(user) -> bool:
     """Check if user has admin privileges."""
@@ -17,70 +30,110 @@ def get_user_admin_status(user) -> bool:
     return user.is_admin or user.is_superuser or user.is_staff
 
 
-def refresh_user_from_db(user):
-    """Safely refresh user from database."""
+def get_request_admin_status(request) -> bool:
+    """
+    Check if the request's user has admin privileges.
+    The result is cached on the request so repeated permission checks
+    within the same request only evaluate it once.
+    """
+    cached = getattr(request, '_is_admin_cache', None)
+    if cached is None:
+        cached = request._is_admin_cache = get_user_admin_status(request.user)
+    return cached
+
+
+USER_PRIVILEGE_FIELDS = ('is_admin', 'is_superuser', 'is_staff', 'is_active')
+
+
+def refresh_user_from_db(user, fields=USER_PRIVILEGE_FIELDS):
+    """
+    Safely refresh user from database.
+    By default only the privilege flags are reloaded; pass fields=None to
+    refresh every column.
+    """
     try:
-        user.refresh_from_db()
+        user.refresh_from_db(fields=fields)
     except Exception as e:
         logger.warning(f"Failed to refresh user from DB: {e}")
 
 
+def refresh_user_privileges(user):
+    """
+    Reload the privilege flags of a user instance, at most once per instance,
+    so the model and signal guards on the same save share a single SELECT.
+    """
+    if not getattr(user, '_privileges_refreshed', False):
+        refresh_user_from_db(user)
+        mark_user_privileges_fresh(user)
+
+
+def mark_user_privileges_fresh(user):
+    """
+    Record that the user's privilege flags were just read from the database,
+    so refresh_user_privileges() skips reloading them on this instance.
+    """
+    user._privileges_refreshed = True
+
+
 def create_error_response(
     message: str,
     error_detail: Optional[str] = None,
     status_code: int = status.HTTP_400_BAD_REQUEST
-) -> Response:
-    """Create a standardized error response."""
-    response_data = {'error': message}
+) -> JsonResponse:
+    """
+    Create a standardized error response.
+    The payload is always a flat dict of strings, so it is serialized
+    directly instead of going through DRF's content negotiation.
+    """
     if error_detail:
-        response_data['detail'] = error_detail
-    return Response(response_data, status=status_code)
+        return JsonResponse({'error': message, 'detail': error_detail}, status=status_code)
+    return JsonResponse({'error': message}, status=status_code)
 
 
 def extract_error_message(exception: Exception) -> str:
     """Extract a clean error message from an exception."""
-    error_msg = str(exception)
-    
-    if hasattr(exception, 'detail'):
-        if isinstance(exception.detail, dict):
-            if 'detail' in exception.detail:
-                error_msg = str(exception.detail['detail'])
-            else:
-                error_msg = str(exception.detail)
+    detail = getattr(exception, 'detail', None)
+    if detail is not None:
+        if isinstance(detail, dict):
+            error_msg = str(detail.get('detail', detail))
         else:
-            error_msg = str(exception.detail)
+            error_msg = str(detail)
     elif hasattr(exception, 'message_dict'):
         error_msg = str(exception.message_dict)
+    else:
+        error_msg = str(exception)
     
     # Clean up common error patterns
-    if 'duplicate key' in error_msg.lower() or 'already exists' in error_msg.lower():
-        error_msg = 'A resource with this identifier already exists.'
-    elif 'Failed to create' in error_msg:
-        parts = error_msg.split('Failed to create', 1)
-        if len(parts) > 1:
-            error_msg = parts[1].strip()
-            # Remove nested error wrappers
-            error_msg = error_msg.replace("{'detail':", "").replace("}", "").strip()
-            if error_msg.startswith("ErrorDetail(string='"):
-                error_msg = error_msg.replace("ErrorDetail(string='", "").replace("', code='invalid')", "").strip()
+    if _DUPLICATE_ERROR_RE.search(error_msg):
+        return 'A resource with this identifier already exists.'
+    
+    match = _FAILED_TO_CREATE_RE.search(error_msg)
+    if match:
+        # Remove nested error wrappers
+        error_msg = match.group('rest').replace("{'detail':", "").replace("}", "").strip()
+        error_msg = _ERROR_DETAIL_RE.sub(r'\1', error_msg).strip()
     
     return error_msg
 
 
 def get_object_created_by_id(obj) -> Optional[int]:
     """Safely get the created_by_id from an object."""
-    if hasattr(obj, 'created_by_id'):
-        return obj.created_by_id
-    if hasattr(obj, 'created_by') and obj.created_by:
-        return obj.created_by.id if hasattr(obj.created_by, 'id') else None
-    return None
+    created_by_id = getattr(obj, 'created_by_id', _MISSING)
+    if created_by_id is not _MISSING:
+        return created_by_id
+    return getattr(getattr(obj, 'created_by', None), 'id', None)
 
 
 def validate_hex_color(color: str) -> bool:
     """Validate if a string is a valid hex color."""
-    import re
-    hex_color_pattern = re.compile(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
-    return bool(hex_color_pattern.match(str(color)))
+    if not isinstance(color, str):
+        color = str(color)
+    return _HEX_COLOR_RE.match(color) is not None
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """Page-number pagination whose page size can be set via `?page_size=`."""
+    page_size_query_param = 'page_size'
 
 
 def paginate_queryset_if_needed(queryset, request, page_size: int = 50):
@@ -88,15 +141,52 @@ def paginate_queryset_if_needed(queryset, request, page_size: int = 50):
     Apply pagination to queryset if pagination parameters are provided.
     Returns (paginated_queryset, use_pagination, page, page_size)
     """
-    use_pagination = 'page' in request.query_params or 'page_size' in request.query_params
-    
-    if use_pagination:
-        from rest_framework.pagination import PageNumberPagination
-        paginator = PageNumberPagination()
-        paginator.page_size = int(request.query_params.get('page_size', page_size))
-        paginated_queryset = paginator.paginate_queryset(queryset, request)
-        page = int(request.query_params.get('page', 1))
-        return paginated_queryset, True, page, paginator.page_size
+    query_params = request.query_params
+    if 'page' not in query_params and 'page_size' not in query_params:
+        return queryset, False, 1, None
     
-    return queryset, False, 1, None
+    # Paginators keep per-request state (request, page) on the instance,
+    # so a fresh one is needed per call; the configuration lives on the class.
+    paginator = OptionalPageNumberPagination()
+    paginator.page_size = page_size
+    paginated_queryset = paginator.paginate_queryset(queryset, request)
+    if paginated_queryset is None:
+        return queryset, False, 1, None
+    return paginated_queryset, True, paginator.page.number, paginator.page.paginator.per_page
 
+
+class StaticContent:
+    """
+    A response body that never changes for the lifetime of the process.
+    The ETag and a gzip-compressed copy are computed once up front, so serving
+    it costs no rendering, hashing or compression per request.
+    """
+    def __init__(self, content: bytes, content_type: str, max_age: int = 3600):
+        self.content = content
+        self.content_type = content_type
+        self.max_age = max_age
+        self.etag = self._make_etag(content)
+        self.gzip_content = gzip.compress(content, compresslevel=9)
+        self.gzip_etag = self._make_etag(self.gzip_content)
+    
+    @staticmethod
+    def _make_etag(content: bytes) -> str:
+        return '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+    
+    def response(self, request) -> HttpResponse:
+        """Serve the content, gzipped if accepted, answering revalidations with 304."""
+        use_gzip = bool(_ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        etag = self.gzip_etag if use_gzip else self.etag
+        
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                self.gzip_content if use_gzip else self.content,
+                content_type=self.content_type,
+            )
+            if use_gzip:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -10,32 +10,63 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'amzpulse.settings')
 django.setup()
 
-from django.db import connection
-from django.db.models import Max
+from django.db import connection, transaction
 from toollinks.models import ToolLink
 from users.models import User
 from workspace_tasks.models import Task
 from workspace_teams.models import Team, TeamMember
 from workspace_documents.models import Document
 
-def fix_sequence(table_name, model_class):
-    """Fix the sequence for a given table."""
+MODELS = [ToolLink, User, Task, Team, TeamMember, Document]
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent runs are serialized
+FIX_SEQUENCES_LOCK_ID = 720_415_001
+
+
+def build_fix_sequences_sql(models):
+    """
+    Build a single statement that looks up each table's id sequence, computes
+    MAX(id) and calls setval() server-side. Tables without a sequence or
+    without rows are reported with a NULL sequence or max and left alone, so
+    one odd table doesn't stop the others from being fixed.
+    """
+    selects = []
+    for model_class in models:
+        table_name = model_class._meta.db_table
+        quoted = connection.ops.quote_name(table_name)
+        pk_column = model_class._meta.pk.column
+        selects.append(
+            f"SELECT '{table_name}', seq, max_id, "
+            f"CASE WHEN seq IS NOT NULL AND max_id IS NOT NULL THEN setval(seq, max_id, true) END "
+            f"FROM (SELECT pg_get_serial_sequence('{quoted}', '{pk_column}') AS seq, "
+            f"(SELECT MAX({connection.ops.quote_name(pk_column)}) FROM {quoted}) AS max_id) AS t"
+        )
+    return ' UNION ALL '.join(selects)
+
+
+def fix_sequences(models):
+    """Fix the sequences for all given models in one round-trip. Returns the number fixed."""
     try:
-        # Get the max ID from the table
-        max_id = model_class.objects.aggregate(max_id=Max('id'))['max_id'] or 0
-        
-        if max_id > 0:
-            # Set the sequence to the max ID (or max_id + 1 to be safe)
-            with connection.cursor() as cursor:
-                cursor.execute(f"SELECT setval('{table_name}_id_seq', {max_id}, true)")
-            print(f"[OK] Fixed {table_name}_id_seq: set to {max_id}")
-            return True
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Held until the transaction ends, so two runs can't interleave
+            # their MAX(id) reads and setval() writes.
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [FIX_SEQUENCES_LOCK_ID])
+            cursor.execute(build_fix_sequences_sql(models))
+            rows = cursor.fetchall()
+    except Exception as e:
+        print(f"[ERROR] Failed to fix sequences: {e}")
+        sys.exit(1)
+    
+    tables_fixed = 0
+    for table_name, sequence, max_id, _ in rows:
+        if not sequence:
+            print(f"[SKIP] {table_name}: no id sequence found")
+        elif max_id:
+            print(f"[OK] Fixed {sequence}: set to {max_id}")
+            tables_fixed += 1
         else:
             print(f"[SKIP] {table_name}: no records found")
-            return False
-    except Exception as e:
-        print(f"[ERROR] Failed to fix {table_name}: {e}")
-        return False
+    return tables_fixed
 
 print("=" * 50)
 print("Fixing PostgreSQL Sequences")
@@ -43,25 +74,7 @@ print("=" * 50)
 print()
 
 # Fix sequences for all tables
-tables_fixed = 0
-
-if fix_sequence('tool_links', ToolLink):
-    tables_fixed += 1
-
-if fix_sequence('users', User):
-    tables_fixed += 1
-
-if fix_sequence('tasks', Task):
-    tables_fixed += 1
-
-if fix_sequence('teams', Team):
-    tables_fixed += 1
-
-if fix_sequence('team_members', TeamMember):
-    tables_fixed += 1
-
-if fix_sequence('documents', Document):
-    tables_fixed += 1
+tables_fixed = fix_sequences(MODELS)
 
 print()
 print("=" * 50)
@@ -69,4 +82,3 @@ print(f"[SUCCESS] Fixed {tables_fixed} sequences")
 print("=" * 50)
 print()
 print("You can now create new tools without ID conflicts!")
-
@@ -0,0 +1,292 @@
+"""
+Shared helpers for the SQLite -> PostgreSQL migration scripts.
+"""
+import io
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from django.db import connection, connections, models, transaction
+
+
+def connect_sqlite(path):
+    """
+    Open the SQLite source database for bulk reads. The migration never
+    writes to it, so only read-side PRAGMAs are set (WAL and synchronous
+    only affect writers): a large page cache and memory-mapped I/O keep the
+    table scans in memory, and query_only guards against accidental writes.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA query_only = ON')
+    conn.execute('PRAGMA cache_size = -200000')  # ~200 MB
+    conn.execute('PRAGMA mmap_size = 268435456')  # 256 MB
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+
+@contextmanager
+def preserve_timestamps(model, *field_names):
+    """
+    bulk_create() still applies auto_now/auto_now_add, which would overwrite
+    the timestamps copied from SQLite. Switch them off for the duration.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def _copy_text(value):
+    """Encode a value for COPY's text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_rows(table, columns, rows, ignore_conflicts=False):
+    """
+    Stream raw row tuples into `table` with COPY ... FROM STDIN (PostgreSQL
+    only). With ignore_conflicts, rows are staged in a temporary table and
+    moved over with INSERT ... ON CONFLICT DO NOTHING, so existing rows are
+    kept. Returns the number of rows written.
+    """
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(_copy_text(value) for value in row))
+        buffer.write('\n')
+        count += 1
+    if not count:
+        return 0
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns)
+    with connection.cursor() as cursor:
+        if not ignore_conflicts:
+            cursor.copy_expert(f'COPY {quote(table)} ({column_list}) FROM STDIN', buffer)
+            return count
+        staging = quote(f'_staging_{table}')
+        cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+        cursor.execute(f'CREATE TEMP TABLE {staging} (LIKE {quote(table)} INCLUDING DEFAULTS)')
+        cursor.copy_expert(f'COPY {staging} ({column_list}) FROM STDIN', buffer)
+        cursor.execute(
+            f'INSERT INTO {quote(table)} ({column_list}) '
+            f'SELECT {column_list} FROM {staging} ON CONFLICT DO NOTHING'
+        )
+        written = cursor.rowcount
+        cursor.execute(f'DROP TABLE {staging}')
+        return written
+
+
+def _copy_value(field, value):
+    """
+    Prepare a model field's value for _copy_text(). JSON is serialized here:
+    get_db_prep_save() wraps it in a driver adapter whose str() is a quoted
+    SQL literal, not the JSON text COPY expects.
+    """
+    if isinstance(field, models.JSONField):
+        return None if value is None else json.dumps(value, cls=field.encoder)
+    return field.get_db_prep_save(value, connection)
+
+
+def copy_insert(model, objs, ignore_conflicts=False):
+    """
+    Stream unsaved model instances into the model's table with
+    COPY ... FROM STDIN (PostgreSQL only). Values are taken as-is from the
+    instances, so no auto_now handling or save() logic runs. Returns the
+    number of rows written.
+    """
+    fields = model._meta.concrete_fields
+    return copy_rows(
+        model._meta.db_table,
+        [field.column for field in fields],
+        (
+            [_copy_value(field, getattr(obj, field.attname)) for field in fields]
+            for obj in objs
+        ),
+        ignore_conflicts=ignore_conflicts,
+    )
+
+
+def bulk_insert(model, objs, batch_size, timestamp_fields=()):
+    """
+    Insert unsaved instances with COPY on PostgreSQL, falling back to
+    bulk_create() on other databases. Rows that hit a unique constraint are
+    skipped on both. Returns the number of rows written.
+    """
+    if not objs:
+        return 0
+    # Savepoint, so a failed batch does not abort the enclosing migration step
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            return copy_insert(model, objs, ignore_conflicts=True)
+        with preserve_timestamps(model, *timestamp_fields):
+            model.objects.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+    # bulk_create() cannot tell which rows were skipped
+    return len(objs)
+
+
+@contextmanager
+def deferred_indexes(*models):
+    """
+    Drop the secondary indexes of the given models' tables and rebuild them
+    on exit, so a bulk load builds each index once instead of maintaining it
+    row by row (PostgreSQL only). Only tables that are still empty are
+    touched: a re-run or top-up loads into a populated table with its
+    indexes in place, rather than rebuilding them over every existing row
+    and holding its table locked meanwhile. Unique and primary-key indexes
+    are kept: they enforce constraints the load relies on. Must run inside a
+    transaction, which also restores the indexes if the load fails.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+
+    tables = [model._meta.db_table for model in models if not model._base_manager.exists()]
+    if not tables:
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT index_class.relname, pg_get_indexdef(index_class.oid)
+            FROM pg_index
+            JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = ANY(%s::regclass[])
+              AND NOT pg_index.indisunique
+              AND NOT pg_index.indisprimary
+            """,
+            [tables],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+
+    yield
+
+    with connection.cursor() as cursor:
+        # PostgreSQL refuses to build an index on a table with pending deferred
+        # foreign-key checks, so run those checks now
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+
+@contextmanager
+def migration_step(*models):
+    """
+    Run one migration step in a single transaction instead of committing per
+    row. On PostgreSQL, synchronous_commit is also relaxed for that
+    transaction only (SET LOCAL): a crash can lose the tail of a one-shot
+    import, which is simply re-run, but never corrupts it. Secondary indexes
+    of the given models' empty tables are rebuilt once at the end of the step.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL synchronous_commit = OFF')
+        with deferred_indexes(*models):
+            yield
+
+
+def existing_ids(model):
+    """
+    Return the primary keys already in the model's table. They are streamed
+    in chunks (a server-side cursor on PostgreSQL), so only the resulting set
+    is held in memory, not the driver's full result buffer as well.
+    """
+    return set(model.objects.values_list('pk', flat=True).iterator(chunk_size=5000))
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(value):
+    """
+    Parse an ISO-8601 timestamp read from SQLite, or return None when it is
+    empty or malformed. Cached because auto-generated timestamps repeat a lot.
+    """
+    if not value:
+        return None
+    try:
+        # Python 3.11+ accepts a trailing 'Z' directly
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def run_in_parallel(*steps):
+    """
+    Run independent migration steps and return their results in order. On
+    PostgreSQL each step gets its own thread, and with it its own database
+    connection, so the COPY streams overlap. SQLite allows a single writer,
+    so there they run one after another.
+    """
+    if connection.vendor != 'postgresql':
+        return [step() for step in steps]
+
+    # Workers open new connections from settings.DATABASES, which the scripts
+    # replace with a bare dj_database_url dict; fill in Django's defaults first
+    connections.configure_settings(connections.settings)
+
+    def run(step):
+        try:
+            return step()
+        finally:
+            # Django connections are per-thread; close the one this worker opened
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+        return list(pool.map(run, steps))
+
+
+def sqlite_bool(value, default):
+    """Convert a SQLite 0/1 column to bool, using `default` for NULL."""
+    return default if value is None else bool(value)
+
+
+def select_rows(conn, table, row_type):
+    """
+    Execute SELECT <row_type's fields> FROM `table` and return the cursor.
+    Rows come back as `row_type` namedtuples, built by the cursor itself, so
+    the column list lives in one place and loops read fields by name.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = lambda cursor, row: row_type._make(row)
+    cursor.execute(f'SELECT {", ".join(row_type._fields)} FROM {table}')
+    return cursor
+
+
+def iter_chunks(cursor, size):
+    """
+    Yield lists of up to `size` rows from an executed cursor so large SQLite
+    tables are never loaded into memory all at once.
+    """
+    cursor.arraysize = size
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield rows
+
+
+def iter_rows(cursor, size):
+    """Yield rows one at a time while fetching them from SQLite in chunks."""
+    for rows in iter_chunks(cursor, size):
+        yield from rows
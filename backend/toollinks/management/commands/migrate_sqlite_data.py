@@ -0,0 +1,414 @@
+"""
+Management command to copy users, tools and teams from the legacy SQLite
+database into the configured (PostgreSQL) database.
+This command will:
+1. Report source row counts and dangling references (preflight)
+2. Load each table in chunks, skipping rows that already exist
+3. Compare source and target row counts (postcheck)
+It is safe to re-run.
+"""
+import logging
+import os
+from collections import namedtuple
+from contextlib import closing
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from sqlite_migration import (
+    bulk_insert, connect_sqlite, existing_ids, iter_chunks, migration_step,
+    parse_timestamp, run_in_parallel, select_rows, sqlite_bool,
+)
+from toollinks.models import ToolLink
+from users.models import User
+from workspace_teams.models import Team, TeamInvite, TeamMember
+
+logger = logging.getLogger(__name__)
+
+# Row shapes read from SQLite; select_rows() builds the SELECT from the field names
+UserRow = namedtuple('UserRow', 'id username email first_name last_name clerk_id avatar_url is_admin date_joined')
+ToolRow = namedtuple('ToolRow', 'id name url description category icon_url is_active created_at updated_at created_by_id is_personal')
+TeamRow = namedtuple('TeamRow', 'id name description created_by_id created_at updated_at')
+MemberRow = namedtuple('MemberRow', 'id team_id user_id role joined_at')
+InviteRow = namedtuple('InviteRow', 'id team_id email invited_by_id status created_at expires_at')
+
+TABLE_GROUPS = ('users', 'tools', 'teams')
+
+# SQLite tables (and their models) covered by each --tables entry
+SOURCE_TABLES = {
+    'users': [('users', User)],
+    'tools': [('tool_links', ToolLink)],
+    'teams': [('teams', Team), ('team_members', TeamMember), ('team_invites', TeamInvite)],
+}
+
+# Rows whose references are missing from the SQLite source
+DANGLING_REFERENCES = {
+    'tools': [
+        ('tools with a missing creator',
+         'SELECT COUNT(*) FROM tool_links WHERE created_by_id IS NOT NULL AND created_by_id NOT IN (SELECT id FROM users)'),
+    ],
+    'teams': [
+        ('teams with a missing creator',
+         'SELECT COUNT(*) FROM teams WHERE created_by_id IS NOT NULL AND created_by_id NOT IN (SELECT id FROM users)'),
+        ('members with a missing team',
+         'SELECT COUNT(*) FROM team_members WHERE team_id NOT IN (SELECT id FROM teams)'),
+        ('members with a missing user',
+         'SELECT COUNT(*) FROM team_members WHERE user_id NOT IN (SELECT id FROM users)'),
+        ('invites with a missing team',
+         'SELECT COUNT(*) FROM team_invites WHERE team_id NOT IN (SELECT id FROM teams)'),
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = 'Copy users, tools and teams from the legacy SQLite database into the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tables',
+            default=','.join(TABLE_GROUPS),
+            help=f'Comma-separated tables to migrate (default: {",".join(TABLE_GROUPS)})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=int(os.environ.get('MIGRATE_BATCH_SIZE', 1000)),
+            help='Rows read from SQLite and loaded per round-trip',
+        )
+        parser.add_argument(
+            '--source',
+            default=str(settings.BASE_DIR / 'db.sqlite3'),
+            help='Path to the SQLite database to read from',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only run the preflight report without importing anything',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.configure_logging()
+        source = options['source']
+        batch_size = options['batch_size']
+        tables = [table.strip() for table in options['tables'].split(',') if table.strip()]
+
+        unknown = set(tables) - set(TABLE_GROUPS)
+        if unknown:
+            raise CommandError(f'Unknown tables: {", ".join(sorted(unknown))} (choose from {", ".join(TABLE_GROUPS)})')
+        if not os.path.exists(source):
+            raise CommandError(f'SQLite database not found: {source}')
+        if connection.vendor == 'sqlite' and os.path.abspath(connection.settings_dict['NAME']) == os.path.abspath(source):
+            raise CommandError('The target database is the SQLite source; point DATABASE_URL at PostgreSQL')
+
+        # Keep the requested tables in dependency order
+        tables = [table for table in TABLE_GROUPS if table in tables]
+
+        source_counts = self.preflight(source, tables)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN: nothing was imported'))
+            return
+
+        for table in tables:
+            self.stdout.write('')
+            self.stdout.write(self.style.SUCCESS('=' * 50))
+            self.stdout.write(self.style.SUCCESS(f'Migrating {table}'))
+            self.stdout.write(self.style.SUCCESS('=' * 50))
+            getattr(self, f'migrate_{table}')(source, batch_size)
+
+        self.postcheck(source_counts)
+
+    def preflight(self, source, tables):
+        """Print source row counts and dangling references; return the counts."""
+        counts = {}
+        with closing(connect_sqlite(source)) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            existing = {name for (name,) in cursor.fetchall()}
+            required = {'users'} | {name for table in tables for name, _ in SOURCE_TABLES[table]}
+            missing = required - existing
+            if missing:
+                raise CommandError(f'SQLite database is missing tables: {", ".join(sorted(missing))}')
+
+            self.stdout.write(self.style.SUCCESS('Preflight'))
+            for table in tables:
+                for name, model in SOURCE_TABLES[table]:
+                    cursor.execute(f'SELECT COUNT(*) FROM {name}')
+                    counts[model] = cursor.fetchone()[0]
+                    self.stdout.write(f'  {name}: {counts[model]} rows in SQLite')
+                for description, sql in DANGLING_REFERENCES.get(table, ()):
+                    cursor.execute(sql)
+                    dangling = cursor.fetchone()[0]
+                    if dangling:
+                        self.stdout.write(self.style.WARNING(f'  {dangling} {description}'))
+        return counts
+
+    def postcheck(self, source_counts):
+        """Compare SQLite row counts with what the target database now holds."""
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Postcheck'))
+        for model, expected in source_counts.items():
+            actual = model.objects.count()
+            line = f'  {model._meta.db_table}: {expected} in SQLite, {actual} in target'
+            # Rows skipped for missing references leave the target short
+            self.stdout.write(self.style.SUCCESS(line) if actual >= expected else self.style.WARNING(line))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def configure_logging(self):
+        """
+        Per-row notices are logged at INFO with %-style arguments, so they are
+        not even formatted at the default WARNING level. Enable them with -v 2
+        or MIGRATE_LOG_LEVEL=INFO.
+        """
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.propagate = False
+        if self.verbosity >= 2:
+            logger.setLevel(logging.INFO)
+        else:
+            logger.setLevel(os.environ.get('MIGRATE_LOG_LEVEL', 'WARNING').upper())
+
+    def progress(self):
+        """Print a dot per loaded chunk instead of a line per row."""
+        if self.verbosity == 1:
+            self.stdout.write('.', ending='')
+            self.stdout.flush()
+
+    def report(self, label, imported, skipped):
+        if self.verbosity == 1:
+            # End the line of progress dots
+            self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} {label} (skipped {skipped} existing)'))
+
+    def migrate_users(self, source, batch_size):
+        # Load existing IDs once instead of checking each row with a query
+        existing_user_ids = existing_ids(User)
+        imported = skipped = 0
+
+        with closing(connect_sqlite(source)) as conn, migration_step(User):
+            cursor = select_rows(conn, 'users', UserRow)
+            for rows in iter_chunks(cursor, batch_size):
+                new_users = []
+                for row in rows:
+                    if row.id in existing_user_ids:
+                        skipped += 1
+                        logger.info('  [SKIP] User %r (ID: %s) already exists', row.username, row.id)
+                        continue
+
+                    new_users.append(User(
+                        id=row.id,
+                        username=row.username or f'user_{row.id}',
+                        email=row.email or '',
+                        first_name=row.first_name or '',
+                        last_name=row.last_name or '',
+                        # clerk_id is unique but nullable, so missing values must stay NULL
+                        clerk_id=row.clerk_id or None,
+                        avatar_url=row.avatar_url or '',
+                        is_admin=sqlite_bool(row.is_admin, False),
+                        date_joined=parse_timestamp(row.date_joined) or timezone.now(),
+                    ))
+
+                try:
+                    imported += bulk_insert(User, new_users, batch_size)
+                except Exception as e:
+                    logger.error('  [ERROR] Failed to import users: %s', e)
+                self.progress()
+
+        self.report('users', imported, skipped)
+        return imported
+
+    def migrate_tools(self, source, batch_size):
+        existing_tool_ids = existing_ids(ToolLink)
+        imported = skipped = 0
+
+        with closing(connect_sqlite(source)) as conn, migration_step(ToolLink):
+            cursor = select_rows(conn, 'tool_links', ToolRow)
+            for rows in iter_chunks(cursor, batch_size):
+                # Resolve every creator referenced by this chunk in one query
+                users_by_id = User.objects.in_bulk({row.created_by_id for row in rows if row.created_by_id})
+
+                new_tools = []
+                for row in rows:
+                    if row.id in existing_tool_ids:
+                        skipped += 1
+                        logger.info('  [SKIP] Tool %r (ID: %s) already exists', row.name, row.id)
+                        continue
+
+                    user = None
+                    if row.created_by_id:
+                        user = users_by_id.get(row.created_by_id)
+                        if user is None:
+                            logger.info('  [WARN] User ID %s not found for tool %r, creating without user', row.created_by_id, row.name)
+
+                    # Timestamps go straight into the constructor; no second save() needed
+                    new_tools.append(ToolLink(
+                        id=row.id,
+                        name=row.name or '',
+                        url=row.url or '',
+                        description=row.description or '',
+                        category=row.category or 'productivity',
+                        icon_url=row.icon_url or None,
+                        is_active=sqlite_bool(row.is_active, True),
+                        created_by=user,
+                        is_personal=sqlite_bool(row.is_personal, False),
+                        created_at=parse_timestamp(row.created_at) or timezone.now(),
+                        updated_at=parse_timestamp(row.updated_at) or timezone.now(),
+                    ))
+
+                try:
+                    imported += bulk_insert(ToolLink, new_tools, batch_size, timestamp_fields=('created_at', 'updated_at'))
+                except Exception as e:
+                    logger.error('  [ERROR] Failed to import tools: %s', e)
+                self.progress()
+
+        self.report('tools', imported, skipped)
+        return imported
+
+    def migrate_teams(self, source, batch_size):
+        imported = self.migrate_team_rows(source, batch_size)
+        # Members and invites only depend on the teams loaded above, so they
+        # are loaded side by side
+        run_in_parallel(
+            lambda: self.migrate_team_members(source, batch_size),
+            lambda: self.migrate_team_invites(source, batch_size),
+        )
+        return imported
+
+    def migrate_team_rows(self, source, batch_size):
+        existing_team_ids = existing_ids(Team)
+        imported = skipped = 0
+
+        with closing(connect_sqlite(source)) as conn, migration_step(Team):
+            cursor = select_rows(conn, 'teams', TeamRow)
+            for rows in iter_chunks(cursor, batch_size):
+                # Resolve the creators referenced by this chunk in one query
+                users_by_id = User.objects.in_bulk({row.created_by_id for row in rows if row.created_by_id})
+
+                new_teams = []
+                for row in rows:
+                    if row.id in existing_team_ids:
+                        skipped += 1
+                        logger.info('  [SKIP] Team %r (ID: %s) already exists', row.name, row.id)
+                        continue
+
+                    user = None
+                    if row.created_by_id:
+                        user = users_by_id.get(row.created_by_id)
+                        if user is None:
+                            logger.info('  [WARN] User ID %s not found for team %r, creating without user', row.created_by_id, row.name)
+
+                    new_teams.append(Team(
+                        id=row.id,
+                        name=row.name or '',
+                        description=row.description or '',
+                        created_by=user,
+                        created_at=parse_timestamp(row.created_at) or timezone.now(),
+                        updated_at=parse_timestamp(row.updated_at) or timezone.now(),
+                    ))
+
+                try:
+                    imported += bulk_insert(Team, new_teams, batch_size, timestamp_fields=('created_at', 'updated_at'))
+                except Exception as e:
+                    logger.error('  [ERROR] Failed to import teams: %s', e)
+                self.progress()
+
+        self.report('teams', imported, skipped)
+        return imported
+
+    def migrate_team_members(self, source, batch_size):
+        existing_member_ids = existing_ids(TeamMember)
+        imported = skipped = 0
+
+        # Runs in a worker thread: sqlite3 connections cannot be shared across threads
+        with closing(connect_sqlite(source)) as conn, migration_step(TeamMember):
+            cursor = select_rows(conn, 'team_members', MemberRow)
+            for rows in iter_chunks(cursor, batch_size):
+                # Resolve the teams and users referenced by this chunk in one query each
+                teams_by_id = Team.objects.in_bulk({row.team_id for row in rows})
+                users_by_id = User.objects.in_bulk({row.user_id for row in rows})
+
+                new_members = []
+                for row in rows:
+                    if row.id in existing_member_ids:
+                        skipped += 1
+                        logger.info('  [SKIP] Member (ID: %s) already exists', row.id)
+                        continue
+
+                    team = teams_by_id.get(row.team_id)
+                    if team is None:
+                        logger.info('  [WARN] Team ID %s not found, skipping member', row.team_id)
+                        continue
+
+                    user = users_by_id.get(row.user_id)
+                    if user is None:
+                        logger.info('  [WARN] User ID %s not found, skipping member', row.user_id)
+                        continue
+
+                    new_members.append(TeamMember(
+                        id=row.id,
+                        team=team,
+                        user=user,
+                        role=row.role or 'member',
+                        joined_at=parse_timestamp(row.joined_at) or timezone.now(),
+                    ))
+
+                try:
+                    imported += bulk_insert(TeamMember, new_members, batch_size, timestamp_fields=('joined_at',))
+                except Exception as e:
+                    logger.error('  [ERROR] Failed to import members: %s', e)
+                self.progress()
+
+        self.report('team members', imported, skipped)
+        return imported
+
+    def migrate_team_invites(self, source, batch_size):
+        existing_invite_ids = existing_ids(TeamInvite)
+        imported = skipped = 0
+
+        # Runs in a worker thread: sqlite3 connections cannot be shared across threads
+        with closing(connect_sqlite(source)) as conn, migration_step(TeamInvite):
+            cursor = select_rows(conn, 'team_invites', InviteRow)
+            for rows in iter_chunks(cursor, batch_size):
+                # Resolve the teams and inviters referenced by this chunk in one query each
+                teams_by_id = Team.objects.in_bulk({row.team_id for row in rows})
+                users_by_id = User.objects.in_bulk({row.invited_by_id for row in rows if row.invited_by_id})
+
+                new_invites = []
+                for row in rows:
+                    if row.id in existing_invite_ids:
+                        skipped += 1
+                        logger.info('  [SKIP] Invite (ID: %s) already exists', row.id)
+                        continue
+
+                    team = teams_by_id.get(row.team_id)
+                    if team is None:
+                        logger.info('  [WARN] Team ID %s not found, skipping invite', row.team_id)
+                        continue
+
+                    user = None
+                    if row.invited_by_id:
+                        user = users_by_id.get(row.invited_by_id)
+                        if user is None:
+                            logger.info('  [WARN] User ID %s not found for invite', row.invited_by_id)
+
+                    new_invites.append(TeamInvite(
+                        id=row.id,
+                        team=team,
+                        email=row.email or '',
+                        invited_by=user,
+                        status=row.status or 'pending',
+                        created_at=parse_timestamp(row.created_at) or timezone.now(),
+                        expires_at=parse_timestamp(row.expires_at),
+                    ))
+
+                try:
+                    imported += bulk_insert(TeamInvite, new_invites, batch_size, timestamp_fields=('created_at',))
+                except Exception as e:
+                    logger.error('  [ERROR] Failed to import invites: %s', e)
+                self.progress()
+
+        self.report('team invites', imported, skipped)
+        return imported
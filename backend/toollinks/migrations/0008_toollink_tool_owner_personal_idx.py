@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toollinks', '0007_add_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='toollink',
+            index=models.Index(fields=['created_by', 'is_personal', 'is_active'], name='tool_owner_personal_idx'),
+        ),
+    ]
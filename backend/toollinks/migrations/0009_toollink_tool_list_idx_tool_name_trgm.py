@@ -0,0 +1,40 @@
+# Generated by Django 4.2.9 on 2026-10-15 14:05
+
+from django.db import migrations, models
+
+
+def create_name_trgm_index(apps, schema_editor):
+    # PostgreSQL only: icontains compiles to UPPER(name) LIKE UPPER(...), so the
+    # trigram index is built on that expression
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # Server built without contrib; search falls back to the name index
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS tool_name_trgm ON tool_links USING gin (UPPER(name) gin_trgm_ops)'
+    )
+
+
+def drop_name_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS tool_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toollinks', '0008_toollink_tool_owner_personal_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='toollink',
+            index=models.Index(fields=['is_active', 'is_personal', 'category', 'name'], name='tool_list_idx'),
+        ),
+        migrations.RunPython(create_name_trgm_index, drop_name_trgm_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.9 on 2026-10-15 14:40
+
+from django.db import migrations
+
+
+def mark_non_admin_tools_personal(apps, schema_editor):
+    # One-off repair of rows written before the pre_save signal enforced
+    # is_personal=True for non-admin creators; the favorites endpoint used
+    # to redo this on every request
+    ToolLink = apps.get_model('toollinks', 'ToolLink')
+    ToolLink.objects.filter(
+        is_personal=False,
+        created_by__is_admin=False,
+        created_by__is_superuser=False,
+        created_by__is_staff=False,
+    ).update(is_personal=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toollinks', '0009_toollink_tool_list_idx_tool_name_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_non_admin_tools_personal, migrations.RunPython.noop),
+    ]
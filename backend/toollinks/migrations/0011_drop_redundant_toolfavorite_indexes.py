@@ -0,0 +1,25 @@
+# Generated by Django 4.2.9 on 2026-10-15 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('toollinks', '0010_mark_non_admin_tools_personal'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='toolfavorite',
+            name='tool_favori_user_id_a9d591_idx',
+        ),
+        migrations.AlterField(
+            model_name='toolfavorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorite_tools', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
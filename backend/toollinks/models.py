@@ -1,5 +1,9 @@
+import logging
 from django.db import models
 from django.conf import settings
+from core_api.utils import get_user_admin_status, refresh_user_privileges
+
+logger = logging.getLogger(__name__)
 
 
 class ToolLink(models.Model):
@@ -38,25 +42,25 @@ class ToolLink(models.Model):
         indexes = [
             models.Index(fields=['is_active', 'is_personal', 'created_by_id']),  # For filtering
             models.Index(fields=['category', 'is_active']),  # For category filtering
-            models.Index(fields=['name']),  # For search
+            models.Index(fields=['name']),  # For search (name__icontains uses a trigram index on PostgreSQL, see migration 0009)
+            models.Index(fields=['is_active', 'is_personal', 'category', 'name'], name='tool_list_idx'),  # For the list query, pre-sorted by name
+            models.Index(fields=['created_by', 'is_personal', 'is_active'], name='tool_owner_personal_idx'),  # For a user's personal tools
         ]
     
     def save(self, *args, **kwargs):
         """Override save to ensure non-admin users always have is_personal=True."""
         # If created_by is set and the user is not an admin, force is_personal=True
-        # This is the final safeguard - even if something bypasses the serializer, this will catch it
-        if self.created_by:
-            # Refresh created_by to ensure we have the latest user data
-            try:
-                self.created_by.refresh_from_db()
-            except:
-                pass  # If refresh fails, use what we have
+        # The serializer already sets is_personal and the pre_save signal guards
+        # every other write path, so this duplicate check only runs in DEBUG
+        # Saves with update_fields only write columns the caller has already vetted
+        if settings.DEBUG and self.created_by and kwargs.get('update_fields') is None:
+            # Reload just the privilege flags, once per user instance, so repeated
+            # saves by the same user don't each pay for a full SELECT
+            refresh_user_privileges(self.created_by)
             
-            if not (self.created_by.is_admin or self.created_by.is_superuser or self.created_by.is_staff):
+            if not get_user_admin_status(self.created_by):
                 if not self.is_personal:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.warning(f"Tool {self.id or 'NEW'} being saved with is_personal=False for non-admin user {self.created_by.id}. Forcing is_personal=True.")
+                    logger.warning("Tool %s being saved with is_personal=False for non-admin user %s. Forcing is_personal=True.", self.id or 'NEW', self.created_by_id)
                     self.is_personal = True
         
         super().save(*args, **kwargs)
@@ -71,7 +75,8 @@ class ToolFavorite(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='favorite_tools'
+        related_name='favorite_tools',
+        db_index=False,  # user_id leads the unique (user, tool) and (user, order) indexes
     )
     tool = models.ForeignKey(
         ToolLink,
@@ -89,7 +94,7 @@ class ToolFavorite(models.Model):
         ordering = ['order', '-created_at']
         indexes = [
             models.Index(fields=['user', 'order']),  # For ordering queries
-            models.Index(fields=['user', 'tool']),   # For existence checks (already covered by unique_together, but explicit for clarity)
+            # Existence checks use the unique_together (user, tool) index
         ]
     
     def __str__(self):
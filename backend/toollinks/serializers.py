@@ -1,6 +1,13 @@
+import logging
+from django.conf import settings
+from django.db import IntegrityError
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from core_api.utils import get_request_admin_status
 from .models import ToolLink, ToolFavorite
 
+logger = logging.getLogger(__name__)
+
 
 class ToolLinkSerializer(serializers.ModelSerializer):
     created_by_name = serializers.SerializerMethodField()
@@ -26,13 +33,13 @@ class ToolLinkSerializer(serializers.ModelSerializer):
         return None
     
     def get_is_favorite(self, obj):
-        """Check if the current user has favorited this tool using prefetched data."""
-        # First try to use prefetched favorite_tool_ids from context (optimized path)
-        favorite_tool_ids = self.context.get('favorite_tool_ids')
-        if favorite_tool_ids is not None:
-            return obj.id in favorite_tool_ids
+        """Check if the current user has favorited this tool using annotated data."""
+        # Tools loaded through the viewset's querysets carry an is_favorite annotation
+        is_favorite = getattr(obj, 'is_favorite', None)
+        if is_favorite is not None:
+            return is_favorite
         
-        # Fallback to query if context not available (for single object serialization)
+        # Fallback to a query for instances not loaded through the viewset (e.g. just created)
         request = self.context.get('request')
         if request and request.user and request.user.is_authenticated:
             return ToolFavorite.objects.filter(user=request.user, tool=obj).exists()
@@ -40,11 +47,11 @@ class ToolLinkSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """Validate that non-admin users cannot create shared tools."""
-        user = self.context['request'].user
         # If this is a create operation and user is not admin, force is_personal=True
         # This prevents non-admin users from creating shared tools even if they try to set is_personal=False
         if self.instance is None:  # This is a create operation
-            if not (user.is_admin or user.is_superuser or user.is_staff):
+            # Cached on the request, so create() reuses it instead of re-checking
+            if not get_request_admin_status(self.context['request']):
                 # Remove is_personal from request data for non-admins - we'll set it ourselves in create()
                 data.pop('is_personal', None)
                 # Force is_personal=True for non-admin users
@@ -54,9 +61,9 @@ class ToolLinkSerializer(serializers.ModelSerializer):
         return data
     
     def create(self, validated_data):
-        user = self.context['request'].user
-        import logging
-        logger = logging.getLogger(__name__)
+        request = self.context['request']
+        user = request.user
+        is_admin = get_request_admin_status(request)
         
         try:
             # Ensure is_active is set if not provided
@@ -65,11 +72,11 @@ class ToolLinkSerializer(serializers.ModelSerializer):
             
             # CRITICAL: Always set created_by and is_personal explicitly for non-admin users
             # This ensures they are set even if something goes wrong with the save() kwargs
-            if not (user.is_admin or user.is_superuser or user.is_staff):
+            if not is_admin:
                 # Force is_personal=True for non-admin users - this is the source of truth
                 validated_data['is_personal'] = True
                 validated_data['created_by'] = user
-                logger.info(f"FORCING is_personal=True for non-admin user {user.id}")
+                logger.debug("FORCING is_personal=True for non-admin user %s", user.id)
             else:
                 # For admins, use what's provided or default to False
                 if 'created_by' not in validated_data:
@@ -78,32 +85,43 @@ class ToolLinkSerializer(serializers.ModelSerializer):
                     validated_data['is_personal'] = False
             
             # Log what we're creating for debugging
-            logger.info(f"Serializer.create() called: is_personal={validated_data.get('is_personal')}, created_by={validated_data.get('created_by')}")
+            logger.debug("Serializer.create() called: is_personal=%s, created_by=%s", validated_data.get('is_personal'), validated_data.get('created_by'))
             
             # Create the instance
             instance = super().create(validated_data)
+            logger.debug("Tool %s created: is_personal=%s, created_by_id=%s, user_id=%s", instance.id, instance.is_personal, instance.created_by_id, user.id)
             
-            # CRITICAL: Verify after creation and fix if wrong
-            instance.refresh_from_db()
-            logger.info(f"Tool {instance.id} created in DB: is_personal={instance.is_personal}, created_by_id={instance.created_by_id}, user_id={user.id}")
-            
-            # If the tool was created incorrectly, fix it immediately
-            if not (user.is_admin or user.is_superuser or user.is_staff):
+            # Optionally verify the stored row and fix it if wrong
+            if settings.TOOLLINK_POSTCREATE_VERIFY and not is_admin:
+                instance.refresh_from_db(fields=['is_personal', 'created_by'])
                 if not instance.is_personal or instance.created_by_id != user.id:
-                    logger.error(f"ERROR: Tool {instance.id} was created incorrectly! Fixing...")
+                    logger.error("ERROR: Tool %s was created incorrectly! Fixing...", instance.id)
                     instance.is_personal = True
                     instance.created_by = user
                     instance.save(update_fields=['is_personal', 'created_by'])
-                    instance.refresh_from_db()
-                    logger.info(f"Fixed tool {instance.id}: is_personal={instance.is_personal}, created_by_id={instance.created_by_id}")
+                    logger.info("Fixed tool %s: is_personal=%s, created_by_id=%s", instance.id, instance.is_personal, instance.created_by_id)
             
             return instance
+        except IntegrityError:
+            # Left to the view, which answers constraint violations directly
+            raise
         except Exception as e:
-            logger.error(f"Error in serializer.create(): {str(e)}", exc_info=True)
-            # Re-raise as ValidationError so it's properly handled
-            from rest_framework.exceptions import ValidationError
-            error_msg = str(e)
-            if 'url' in error_msg.lower() or 'invalid' in error_msg.lower():
-                raise ValidationError({'url': 'Please provide a valid URL'})
-            raise ValidationError({'detail': f'Failed to create tool: {error_msg}'})
+            logger.error("Error in serializer.create(): %s", e, exc_info=True)
+            # Re-raise as ValidationError so it's properly handled. Invalid URLs
+            # never get here: the URLField rejects them during validation
+            raise ValidationError({'detail': f'Failed to create tool: {e}'})
 
+
+class ToolLinkListSerializer(ToolLinkSerializer):
+    """
+    Shared-tools list representation: everything but the creator's name,
+    which would need a join on users for every row.
+    """
+    created_by_name = None
+    
+    class Meta(ToolLinkSerializer.Meta):
+        fields = [
+            'id', 'name', 'url', 'description', 'category',
+            'icon_url', 'is_active', 'is_personal', 'created_by',
+            'created_at', 'updated_at', 'is_favorite'
+        ]
@@ -1,12 +1,46 @@
+import json
+import logging
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from django.db import models
+from rest_framework.pagination import CursorPagination
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce
 from core_api.permissions import IsAdminOrReadOnly as BaseIsAdminOrReadOnly
-from core_api.utils import get_user_admin_status, refresh_user_from_db, extract_error_message, create_error_response
+from core_api.utils import (
+    OptionalPageNumberPagination, StaticContent, get_request_admin_status, get_user_admin_status,
+    paginate_queryset_if_needed, refresh_user_privileges, extract_error_message,
+    create_error_response,
+)
 from .models import ToolLink, ToolFavorite
-from .serializers import ToolLinkSerializer
+from .serializers import ToolLinkSerializer, ToolLinkListSerializer
+
+logger = logging.getLogger(__name__)
+
+# The category choices are fixed in code, so the response is rendered once
+_CATEGORIES_JSON = StaticContent(
+    json.dumps([
+        {'value': value, 'label': label}
+        for value, label in ToolLink.CATEGORY_CHOICES
+    ]).encode('utf-8'),
+    'application/json',
+)
+
+
+def _validation_message(detail):
+    """
+    Flatten a ValidationError's detail into the single string the frontend
+    shows, e.g. "url: Enter a valid URL." for field errors.
+    """
+    if isinstance(detail, dict):
+        if 'detail' in detail:
+            return _validation_message(detail['detail'])
+        return '; '.join(f'{field}: {_validation_message(errors)}' for field, errors in detail.items())
+    if isinstance(detail, list):
+        return ', '.join(_validation_message(error) for error in detail)
+    return str(detail)
 
 
 class IsAdminOrReadOnly(BaseIsAdminOrReadOnly):
@@ -20,7 +54,7 @@ class IsAdminOrReadOnly(BaseIsAdminOrReadOnly):
         if not request.user or not request.user.is_authenticated:
             return False
         # Allow admins to do anything
-        if request.user.is_admin or request.user.is_superuser or request.user.is_staff:
+        if get_request_admin_status(request):
             return True
         # Allow users to create personal tools
         if request.method == 'POST':
@@ -29,9 +63,6 @@ class IsAdminOrReadOnly(BaseIsAdminOrReadOnly):
     
     def has_object_permission(self, request, view, obj):
         """Check if user can edit/delete a specific tool."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         # Allow read-only operations (GET, HEAD, OPTIONS) for all authenticated users
         if request.method in permissions.SAFE_METHODS:
             return True
@@ -43,50 +74,37 @@ class IsAdminOrReadOnly(BaseIsAdminOrReadOnly):
         
         # Ensure user is authenticated
         if not request.user or not request.user.is_authenticated:
-            logger.warning(f"Unauthenticated user denied permission to edit tool {obj.id}")
+            logger.warning("Unauthenticated user denied permission to edit tool %s", obj.id)
             return False
         
-        # Admins can edit/delete any tool
-        if request.user.is_admin or request.user.is_superuser or request.user.is_staff:
-            logger.info(f"Admin user {request.user.id} allowed to edit tool {obj.id}")
+        # Admins can edit/delete any tool (cached on the request by has_permission)
+        if get_request_admin_status(request):
+            logger.debug("Admin user %s allowed to edit tool %s", request.user.id, obj.id)
             return True
         
-        # Get created_by_id - try multiple ways to ensure we get it
-        created_by_id = None
-        if hasattr(obj, 'created_by_id'):
-            created_by_id = obj.created_by_id
-        elif obj.created_by:
-            created_by_id = obj.created_by.id if hasattr(obj.created_by, 'id') else None
-        
-        # Users can edit/delete their own tools (whether personal or not)
-        # Check by created_by_id first (most reliable)
-        if created_by_id and created_by_id == request.user.id:
-            logger.info(f"User {request.user.id} allowed to edit their own tool {obj.id} (is_personal={obj.is_personal}, created_by_id={created_by_id})")
-            return True
-        
-        # Also check by created_by object comparison (fallback)
-        if obj.created_by:
-            try:
-                if obj.created_by.id == request.user.id:
-                    logger.info(f"User {request.user.id} allowed to edit their own tool {obj.id} via object comparison (is_personal={obj.is_personal})")
-                    return True
-            except Exception as e:
-                logger.warning(f"Error comparing created_by object: {e}")
-        
-        # Also check if it's a personal tool created by this user (double check)
-        if obj.is_personal and created_by_id == request.user.id:
-            logger.info(f"User {request.user.id} allowed to edit personal tool {obj.id}")
+        # Users can edit/delete their own tools (whether personal or not); compare
+        # the FK column so the creator row is never fetched
+        if obj.created_by_id is not None and obj.created_by_id == request.user.id:
+            logger.debug("User %s allowed to edit their own tool %s (is_personal=%s)", request.user.id, obj.id, obj.is_personal)
             return True
         
-        logger.warning(f"User {request.user.id} denied permission to edit tool {obj.id} (created_by_id={created_by_id}, is_personal={getattr(obj, 'is_personal', None)}, request.user.id={request.user.id}, action={view.action})")
+        logger.warning(
+            "User %s denied permission to edit tool %s (created_by_id=%s, is_personal=%s, action=%s)",
+            request.user.id, obj.id, obj.created_by_id, obj.is_personal, view.action,
+        )
         return False
 
 
-class ToolLinkPagination(PageNumberPagination):
-    """Custom pagination for tool links."""
+class ToolLinkPagination(CursorPagination):
+    """
+    Custom pagination for tool links. Pages are addressed by a cursor on the
+    name ordering, so later pages are index range scans with no OFFSET and
+    no COUNT(*).
+    """
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 200
+    ordering = ('name', 'id')
 
 
 class ToolLinkViewSet(viewsets.ModelViewSet):
@@ -102,8 +120,6 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
     
     def create(self, request, *args, **kwargs):
         """Override create to provide better error handling."""
-        import logging
-        logger = logging.getLogger(__name__)
         
         try:
             serializer = self.get_serializer(data=request.data)
@@ -111,40 +127,17 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-        except Exception as e:
-            logger.error(f"Error creating tool: {str(e)}", exc_info=True)
-            # Return a proper error response
-            error_detail = str(e)
-            
-            # Extract the actual error message from nested error details
-            if hasattr(e, 'detail'):
-                if isinstance(e.detail, dict):
-                    # If detail is a dict, try to get the actual message
-                    if 'detail' in e.detail:
-                        error_detail = str(e.detail['detail'])
-                    else:
-                        error_detail = str(e.detail)
-                else:
-                    error_detail = str(e.detail)
-            elif hasattr(e, 'message_dict'):
-                error_detail = e.message_dict
-            
-            # Clean up the error message - remove nested error details
-            if 'duplicate key' in error_detail.lower() or 'already exists' in error_detail.lower():
-                error_detail = 'A tool with this ID already exists. Please try again.'
-            elif 'Failed to create tool:' in error_detail:
-                # Extract the actual error after "Failed to create tool:"
-                parts = error_detail.split('Failed to create tool:', 1)
-                if len(parts) > 1:
-                    error_detail = parts[1].strip()
-                    # Remove nested error detail wrappers
-                    if error_detail.startswith("{'detail':"):
-                        error_detail = error_detail.replace("{'detail':", "").replace("}", "").strip()
-                        if error_detail.startswith("ErrorDetail(string='"):
-                            error_detail = error_detail.replace("ErrorDetail(string='", "").replace("', code='invalid')", "").strip()
-            
+        except IntegrityError as e:
+            logger.error("Error creating tool: %s", e, exc_info=True)
+            return Response(
+                {'detail': 'A tool with this ID already exists. Please try again.',
+                 'message': 'An error occurred while creating the tool'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValidationError as e:
+            logger.error("Error creating tool: %s", e.detail)
             return Response(
-                {'detail': error_detail, 'message': 'An error occurred while creating the tool'},
+                {'detail': _validation_message(e.detail), 'message': 'An error occurred while creating the tool'},
                 status=status.HTTP_400_BAD_REQUEST
             )
     
@@ -153,9 +146,6 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
         # For detail operations (retrieve, update, delete), also include user's own personal tools
         user = self.request.user
         
-        import logging
-        logger = logging.getLogger(__name__)
-        
         # Check if this is a detail operation (retrieve, update, partial_update, destroy)
         if self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
             # Allow access to shared tools AND user's own personal tools
@@ -163,12 +153,12 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
             # Use created_by_id for more reliable filtering
             if self.action in ['update', 'partial_update', 'destroy']:
                 # For edit operations, include user's tools even if inactive
+                # (the user's own tools already cover their personal ones)
                 queryset = ToolLink.objects.filter(
-                    models.Q(is_personal=False, is_active=True) | 
-                    models.Q(is_personal=True, created_by_id=user.id) |
+                    models.Q(is_personal=False, is_active=True) |
                     models.Q(created_by_id=user.id)  # Include user's tools regardless of is_personal or is_active
                 )
-                logger.debug(f"Edit action '{self.action}': including all user's tools (user_id={user.id})")
+                logger.debug("Edit action '%s': including all user's tools (user_id=%s)", self.action, user.id)
             else:
                 # For retrieve, only show active tools
                 queryset = ToolLink.objects.filter(
@@ -176,14 +166,14 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
                 ).filter(
                     models.Q(is_personal=False) | models.Q(is_personal=True, created_by_id=user.id)
                 )
-                logger.debug(f"Retrieve action: including user's personal tools (user_id={user.id})")
+                logger.debug("Retrieve action: including user's personal tools (user_id=%s)", user.id)
         else:
             # For list operations, only show shared/public tools
             queryset = ToolLink.objects.filter(
                 is_active=True,
                 is_personal=False  # Only show shared/public tools, never personal tools
             )
-            logger.debug(f"List action: filtering is_personal=False, is_active=True")
+            logger.debug("List action: filtering is_personal=False, is_active=True")
         
         # Filter by category if provided
         category = self.request.query_params.get('category')
@@ -195,39 +185,30 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
         if search:
             queryset = queryset.filter(name__icontains=search)
         
-        return queryset
-    
-    def list(self, request, *args, **kwargs):
-        """Override list to prefetch favorite status for all tools in the response."""
-        response = super().list(request, *args, **kwargs)
-        
-        # OPTIMIZED: Bulk prefetch favorite status for all tools in the response
-        # Handle both paginated and non-paginated responses
-        tools = None
-        if hasattr(response, 'data'):
-            if isinstance(response.data, dict) and 'results' in response.data:
-                # Paginated response
-                tools = response.data['results']
-            elif isinstance(response.data, list):
-                # Non-paginated list response
-                tools = response.data
-        
-        if tools and request.user.is_authenticated:
-            tool_ids = [tool.get('id') for tool in tools if tool.get('id')]
-            if tool_ids:
-                favorite_status = set(
-                    ToolFavorite.objects.filter(
-                        user=request.user,
-                        tool_id__in=tool_ids
-                    ).values_list('tool_id', flat=True)
+        # toggle_favorite only needs the tool to exist; nothing is serialized
+        if self.action == 'toggle_favorite':
+            return queryset
+        
+        if self.action != 'list':
+            # created_by_name reads the creator on every row; join it in.
+            # ToolLinkListSerializer leaves it out, so the list needs no join
+            queryset = queryset.select_related('created_by')
+        
+        # OPTIMIZED: is_favorite is computed inside the main SELECT, so the
+        # serializer never queries ToolFavorite per tool
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorite=models.Exists(
+                    ToolFavorite.objects.filter(user_id=user.id, tool_id=models.OuterRef('pk'))
                 )
-                
-                # Update favorite status in serializer data
-                for tool in tools:
-                    if tool.get('id') in favorite_status:
-                        tool['is_favorite'] = True
+            )
         
-        return response
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ToolLinkListSerializer
+        return super().get_serializer_class()
     
     def get_serializer_context(self):
         """Add request context to serializer for is_favorite field."""
@@ -238,181 +219,128 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Set created_by and is_personal based on user permissions."""
         user = self.request.user
-        import logging
-        logger = logging.getLogger(__name__)
         
         try:
-            # Refresh user from DB to ensure we have latest admin status
-            try:
-                user.refresh_from_db()
-            except:
-                pass
+            # Make sure the privilege flags are current; a no-op when authentication
+            # has just loaded the user, and the pre_save signal reuses them either way
+            refresh_user_privileges(user)
             
-            logger.info(f"perform_create: user_id={user.id}, is_admin={user.is_admin}, is_superuser={user.is_superuser}, is_staff={user.is_staff}")
+            logger.debug("perform_create: user_id=%s, is_admin=%s, is_superuser=%s, is_staff=%s", user.id, user.is_admin, user.is_superuser, user.is_staff)
             
             # If user is not admin, mark as personal tool
-            if not (user.is_admin or user.is_superuser or user.is_staff):
-                # Use save() with keyword arguments - this is the standard DRF pattern
+            if not get_user_admin_status(user):
+                # Use save() with keyword arguments - this is the standard DRF pattern.
+                # The pre_save signal enforces is_personal=True as well, so the row
+                # is not read back to double-check it
                 instance = serializer.save(created_by=user, is_personal=True)
-                # Verify the tool was created with is_personal=True
-                instance.refresh_from_db()
-                logger.info(f"Created tool {instance.id}: name='{instance.name}', is_personal={instance.is_personal}, is_active={instance.is_active}, created_by_id={instance.created_by_id if instance.created_by else None}, user_id={user.id}, is_admin={user.is_admin}")
-                
-                # CRITICAL: Double-check and fix if wrong (signal should handle this, but be extra safe)
-                if not instance.is_personal:
-                    logger.error(f"CRITICAL ERROR: Tool {instance.id} was NOT created with is_personal=True! User: {user.id}, is_admin: {user.is_admin}. Fixing immediately...")
-                    ToolLink.objects.filter(id=instance.id).update(is_personal=True)
-                    instance.refresh_from_db()
-                    logger.info(f"Fixed tool {instance.id} - is_personal is now {instance.is_personal}")
-                
-                if instance.created_by_id != user.id:
-                    logger.error(f"ERROR: Tool {instance.id} created_by ({instance.created_by_id}) does not match user ({user.id})!")
+                logger.info("Created tool %s: name='%s', is_personal=%s, is_active=%s, created_by_id=%s, user_id=%s", instance.id, instance.name, instance.is_personal, instance.is_active, instance.created_by_id, user.id)
             else:
                 # Admins can create both shared and personal tools
                 # The serializer will handle setting is_personal based on request data
                 # Just set created_by
                 instance = serializer.save(created_by=user)
-                logger.info(f"Admin created tool {instance.id}: name='{instance.name}', is_personal={instance.is_personal}")
+                logger.info("Admin created tool %s: name='%s', is_personal=%s", instance.id, instance.name, instance.is_personal)
+        except (ValidationError, IntegrityError):
+            # Already structured; create() turns these into the error response
+            raise
         except Exception as e:
-            logger.error(f"Error in perform_create: {str(e)}", exc_info=True)
-            from rest_framework.exceptions import ValidationError
+            logger.error("Error in perform_create: %s", e, exc_info=True)
             raise ValidationError({'detail': f'Failed to create tool: {str(e)}'})
     
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """Return list of available categories."""
-        return Response([
-            {'value': choice[0], 'label': choice[1]}
-            for choice in ToolLink.CATEGORY_CHOICES
-        ])
+        return _CATEGORIES_JSON.response(request)
     
     @action(detail=True, methods=['post'])
     def toggle_favorite(self, request, pk=None):
-        """Toggle favorite status for a tool. Optimized to use count instead of max order."""
+        """Toggle favorite status for a tool in a single query either way."""
         tool = self.get_object()
         user = request.user
         
-        try:
-            favorite = ToolFavorite.objects.get(user=user, tool=tool)
-            # If it already exists, remove it (unfavorite)
-            favorite.delete()
+        # If it already exists, remove it (unfavorite); delete() reports how many
+        # rows went, so no lookup is needed first
+        deleted, _ = ToolFavorite.objects.filter(user=user, tool=tool).delete()
+        if deleted:
             return Response({'is_favorite': False}, status=status.HTTP_200_OK)
-        except ToolFavorite.DoesNotExist:
-            # OPTIMIZED: Use count instead of max order (O(1) with index vs O(F) scan)
-            # Count is faster and works well for ordering (new items go to end)
-            current_count = ToolFavorite.objects.filter(user=user).count()
-            new_order = current_count
-            
-            # Create new favorite with order
-            favorite = ToolFavorite.objects.create(
-                user=user,
-                tool=tool,
-                order=new_order
-            )
-            return Response({'is_favorite': True}, status=status.HTTP_201_CREATED)
+        
+        # New favorites go to the end. The order is computed by a subquery inside
+        # the INSERT itself rather than by a separate aggregate query
+        next_order = ToolFavorite.objects.filter(user=user).order_by().values('user').annotate(
+            next_order=models.Max('order') + 1,
+        ).values('next_order')
+        ToolFavorite.objects.create(
+            user=user,
+            tool=tool,
+            order=Coalesce(models.Subquery(next_order), 0),
+        )
+        return Response({'is_favorite': True}, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=['get'])
     def favorites(self, request):
         """Get all tools favorited by the current user, plus user's personal tools, ordered by user preference.
         Optimized with bulk prefetching and database-level filtering."""
         user = request.user
-        import logging
-        logger = logging.getLogger(__name__)
         
-        # Refresh user to get latest admin status
-        try:
-            user.refresh_from_db()
-        except:
-            pass
-        
-        # CRITICAL: Fix any tools that should be personal but aren't (for non-admin users)
-        if not (user.is_admin or user.is_superuser or user.is_staff):
-            # Find tools created by this user that should be personal but aren't
-            incorrect_tools = ToolLink.objects.filter(
-                created_by_id=user.id,
-                is_personal=False
-            )
-            if incorrect_tools.exists():
-                count = incorrect_tools.count()
-                logger.warning(f"Found {count} tools for user {user.id} that should be personal. Fixing...")
-                incorrect_tools.update(is_personal=True)
-                logger.info(f"Fixed {count} tools for user {user.id}")
-        
-        # Get query parameters for filtering and pagination
+        # Get query parameters for filtering
         category = request.query_params.get('category')
         search = request.query_params.get('search')
-        # Check if pagination is requested (backward compatibility: return array if no pagination params)
-        use_pagination = 'page' in request.query_params or 'page_size' in request.query_params
-        page_size = int(request.query_params.get('page_size', 50)) if use_pagination else None
-        page = int(request.query_params.get('page', 1)) if use_pagination else 1
-        
-        # OPTIMIZED: Get favorites with database-level filtering
-        user_favorites = ToolFavorite.objects.filter(
-            user=user,
-            tool__is_active=True
-        ).select_related('tool', 'tool__created_by').prefetch_related('tool__created_by')
         
-        # Apply database-level filtering for category
-        if category:
-            user_favorites = user_favorites.filter(tool__category=category)
-        
-        # Apply database-level filtering for search
-        if search:
-            user_favorites = user_favorites.filter(tool__name__icontains=search)
-        
-        # Order by user preference
-        user_favorites = user_favorites.order_by('order', '-created_at')
-        
-        # Get favorite tool IDs (single query evaluation with values_list)
-        favorite_tool_ids = set(user_favorites.values_list('tool_id', flat=True))
-        
-        # OPTIMIZED: Get personal tools with database-level filtering
-        personal_tools_qs = ToolLink.objects.filter(
-            created_by_id=user.id,
-            is_personal=True,
-            is_active=True
-        ).exclude(id__in=favorite_tool_ids)
+        # Favorites and personal tools come from one query. The candidate set is
+        # driven by the user's own (indexed) favorite rows and personal tools, and
+        # only those rows are annotated with the favorite's order and date:
+        # favorites are listed first in the user's order, then the remaining
+        # personal tools, newest first. This lets pagination slice in SQL instead
+        # of after concatenating lists
+        user_favorites = ToolFavorite.objects.filter(user=user)
+        user_favorite = user_favorites.filter(tool=models.OuterRef('pk')).order_by()
+        tools_qs = ToolLink.objects.filter(
+            models.Q(pk__in=user_favorites.values('tool_id')) |
+            models.Q(created_by_id=user.id, is_personal=True),
+            is_active=True,
+        ).annotate(
+            favorite_order=models.Subquery(user_favorite.values('order')[:1]),
+            favorited_at=models.Subquery(user_favorite.values('created_at')[:1]),
+        )
         
         # Apply database-level filtering
         if category:
-            personal_tools_qs = personal_tools_qs.filter(category=category)
+            tools_qs = tools_qs.filter(category=category)
         if search:
-            personal_tools_qs = personal_tools_qs.filter(name__icontains=search)
-        
-        personal_tools_qs = personal_tools_qs.order_by('-created_at')
+            tools_qs = tools_qs.filter(name__icontains=search)
         
-        # Evaluate favorites queryset (now filtered at DB level)
-        favorites_list = list(user_favorites)
-        favorite_tools = [fav.tool for fav in favorites_list]
+        tools_qs = tools_qs.select_related('created_by').order_by(
+            models.F('favorite_order').asc(nulls_last=True),
+            models.F('favorited_at').desc(),
+            '-created_at',
+        )
         
-        # Get personal tools (apply pagination only if requested)
-        if use_pagination and page_size:
-            personal_tools_limit = max(0, page_size - len(favorite_tools))
-            personal_tools = list(personal_tools_qs[:personal_tools_limit])
-            has_more = len(personal_tools) == personal_tools_limit and personal_tools_qs.count() > personal_tools_limit
+        # Backward compatibility: return the full array unless pagination is requested
+        use_pagination = 'page' in request.query_params or 'page_size' in request.query_params
+        if use_pagination:
+            paginator = OptionalPageNumberPagination()
+            paginator.page_size = 50
+            page_size = paginator.get_page_size(request)
+            try:
+                page = int(request.query_params.get('page', 1))
+            except ValueError:
+                page = 0
+            if page < 1:
+                raise NotFound('Invalid page.')
+            # Fetch one row past the page to learn whether another page follows,
+            # instead of running a COUNT(*) over the whole filtered set
+            offset = (page - 1) * page_size
+            all_tools = list(tools_qs[offset:offset + page_size + 1])
+            has_more = len(all_tools) > page_size
+            all_tools = all_tools[:page_size]
         else:
-            # No pagination: return all personal tools
-            personal_tools = list(personal_tools_qs)
-            has_more = False
-        
-        # Combine tools
-        all_tools = favorite_tools + personal_tools
-        
-        # OPTIMIZED: Bulk prefetch is_favorite status for all tools in one query
-        tool_ids = [tool.id for tool in all_tools]
-        favorite_status = set(
-            ToolFavorite.objects.filter(
-                user=user,
-                tool_id__in=tool_ids
-            ).values_list('tool_id', flat=True)
-        )
+            all_tools = list(tools_qs)
         
-        # Add favorite_tool_ids to context for serializer
-        context = self.get_serializer_context()
-        context['favorite_tool_ids'] = favorite_status
+        # Only favorites carry an order; the serializer reads is_favorite from here
+        for tool in all_tools:
+            tool.is_favorite = tool.favorite_order is not None
         
-        # Serialize with optimized context
-        serializer = self.get_serializer(all_tools, many=True, context=context)
+        serializer = self.get_serializer(all_tools, many=True)
         
         # Backward compatibility: return array if pagination not requested
         if not use_pagination:
@@ -421,74 +349,77 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
         # Return paginated response if pagination requested
         return Response({
             'results': serializer.data,
-            'count': len(all_tools),
             'page': page,
             'page_size': page_size,
             'has_more': has_more
         })
     
-    @action(detail=False, methods=['get'])
-    def debug_my_tools(self, request):
-        """Debug endpoint to see all tools for the current user."""
-        user = request.user
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        # Get all tools created by this user
-        all_my_tools = ToolLink.objects.filter(created_by_id=user.id)
-        
-        # Get all personal tools
-        personal_tools = ToolLink.objects.filter(created_by_id=user.id, is_personal=True)
-        
-        # Get all active personal tools
-        active_personal = ToolLink.objects.filter(created_by_id=user.id, is_personal=True, is_active=True)
-        
-        debug_info = {
-            'user_id': user.id,
-            'user_email': getattr(user, 'email', 'no email'),
-            'total_tools_created': all_my_tools.count(),
-            'total_personal_tools': personal_tools.count(),
-            'active_personal_tools': active_personal.count(),
-            'tools': []
-        }
-        
-        for tool in all_my_tools:
-            debug_info['tools'].append({
-                'id': tool.id,
-                'name': tool.name,
-                'is_personal': tool.is_personal,
-                'is_active': tool.is_active,
-                'created_by_id': tool.created_by_id,
-                'created_at': tool.created_at.isoformat() if tool.created_at else None,
-            })
-        
-        logger.info(f"Debug info for user {user.id}: {debug_info}")
-        return Response(debug_info)
+    # Diagnostic endpoint: only routed in DEBUG, the router never sees it otherwise
+    if settings.DEBUG:
+        @action(detail=False, methods=['get'])
+        def debug_my_tools(self, request):
+            """Debug endpoint to see all tools for the current user."""
+            user = request.user
+            
+            # Get all tools created by this user
+            all_my_tools = ToolLink.objects.filter(created_by_id=user.id)
+            
+            # All, personal and active personal counts in one aggregate query
+            counts = all_my_tools.aggregate(
+                total=models.Count('id'),
+                personal=models.Count('id', filter=models.Q(is_personal=True)),
+                active_personal=models.Count('id', filter=models.Q(is_personal=True, is_active=True)),
+            )
+            
+            debug_info = {
+                'user_id': user.id,
+                'user_email': getattr(user, 'email', 'no email'),
+                'total_tools_created': counts['total'],
+                'total_personal_tools': counts['personal'],
+                'active_personal_tools': counts['active_personal'],
+                'tools': []
+            }
+            
+            # Plain dicts of just the reported columns; no model instances are built.
+            # The tool list is paginated in SQL when ?page/?page_size is given,
+            # otherwise it is streamed instead of loaded into the queryset cache
+            tool_rows = all_my_tools.values('id', 'name', 'is_personal', 'is_active', 'created_by_id', 'created_at')
+            my_tools, use_pagination, page, page_size = paginate_queryset_if_needed(tool_rows, request)
+            if use_pagination:
+                debug_info['page'] = page
+                debug_info['page_size'] = page_size
+            else:
+                my_tools = my_tools.iterator(chunk_size=500)
+            
+            for tool in my_tools:
+                created_at = tool['created_at']
+                tool['created_at'] = created_at.isoformat() if created_at else None
+                debug_info['tools'].append(tool)
+            
+            logger.info(
+                "Debug info for user %s: %s tools, %s personal, %s active personal",
+                user.id, debug_info['total_tools_created'],
+                debug_info['total_personal_tools'], debug_info['active_personal_tools'],
+            )
+            return Response(debug_info)
     
     @action(detail=False, methods=['post'])
     def fix_personal_tools(self, request):
         """Fix any tools that should be personal but aren't marked as such."""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Find all tools created by non-admin users that have is_personal=False
-        non_admin_users = User.objects.filter(
-            is_admin=False,
-            is_superuser=False,
-            is_staff=False
-        )
-        
-        incorrect_tools = ToolLink.objects.filter(
-            created_by__in=non_admin_users,
-            is_personal=False
-        )
+        # Maintenance action: hidden from non-admins rather than forbidden
+        if not get_request_admin_status(request):
+            raise NotFound()
         
-        count = incorrect_tools.count()
-        incorrect_tools.update(is_personal=True)
+        # One UPDATE joined to the creator's flags; update() returns the row count,
+        # so no separate count() query is needed
+        count = ToolLink.objects.filter(
+            is_personal=False,
+            created_by__is_admin=False,
+            created_by__is_superuser=False,
+            created_by__is_staff=False,
+        ).update(is_personal=True)
         
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Fixed {count} tools that should have been personal")
+        logger.info("Fixed %s tools that should have been personal", count)
         
         return Response({
             'message': f'Fixed {count} tools that should have been personal',
@@ -497,9 +428,7 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def reorder_favorites(self, request):
-        """Update the order of favorite tools for the current user. Optimized with bulk_update."""
-        from django.db import transaction
-        
+        """Update the order of favorite tools for the current user. Optimized with a single CASE update."""
         user = request.user
         tool_orders = request.data.get('orders', [])  # Expected: [{'tool_id': 1, 'order': 0}, ...]
         
@@ -522,25 +451,23 @@ class ToolLinkViewSet(viewsets.ModelViewSet):
                 'updated_count': 0
             })
         
-        # OPTIMIZED: Get all favorites to update in one query
+        # OPTIMIZED: One UPDATE ... SET order = CASE tool_id WHEN ... END per
+        # batch, evaluated by the database; nothing is read back first
+        # (batched so a very long reorder doesn't build one huge CASE expression)
+        items = list(order_map.items())
+        updated_count = 0
         with transaction.atomic():
-            favorites_to_update = ToolFavorite.objects.filter(
-                user=user,
-                tool_id__in=order_map.keys()
-            )
-            
-            # Update order in memory
-            updated = []
-            for favorite in favorites_to_update:
-                if favorite.tool_id in order_map:
-                    favorite.order = order_map[favorite.tool_id]
-                    updated.append(favorite)
-            
-            # OPTIMIZED: Bulk update in single query instead of N individual saves
-            if updated:
-                ToolFavorite.objects.bulk_update(updated, ['order'])
+            for start in range(0, len(items), 500):
+                batch = items[start:start + 500]
+                updated_count += ToolFavorite.objects.filter(
+                    user=user,
+                    tool_id__in=[tool_id for tool_id, _ in batch],
+                ).update(order=models.Case(
+                    *[models.When(tool_id=tool_id, then=models.Value(order)) for tool_id, order in batch],
+                    output_field=models.IntegerField(),
+                ))
         
         return Response({
-            'message': f'Updated order for {len(updated)} tools',
-            'updated_count': len(updated)
+            'message': f'Updated order for {updated_count} tools',
+            'updated_count': updated_count
         })
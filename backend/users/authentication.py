@@ -1,9 +1,75 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 import jwt
+from jwt.algorithms import RSAAlgorithm
 from django.conf import settings
 from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
+from core_api.utils import mark_user_privileges_fresh
 from .models import User
 
+# Decoded token payloads, keyed by a digest of the raw token (the token itself
+# is never stored). A client sends the same bearer token with every request
+# until it expires, so the signature is only verified on the first one.
+_TOKEN_CACHE_MAX_SIZE = 10000
+_TOKEN_CACHE_TTL = 60  # seconds; an entry never outlives the token's own exp
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token):
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def get_cached_token_payload(token):
+    """Return the cached payload of an already verified token, or None."""
+    key = _token_cache_key(token)
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return payload
+
+
+def _cache_token_payload(token, payload):
+    expires_at = time.time() + _TOKEN_CACHE_TTL
+    exp = payload.get('exp')
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    key = _token_cache_key(token)
+    with _token_cache_lock:
+        _token_cache[key] = (payload, expires_at)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > _TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_public_key(pem):
+    """
+    Parse Clerk's PEM public key into a key object. Keyed on the PEM text, so
+    a changed setting is picked up without any invalidation.
+    """
+    return RSAAlgorithm(RSAAlgorithm.SHA256).prepare_key(pem)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_jwk_client(jwks_url):
+    """
+    One JWKS client per endpoint. It caches the fetched key set and the
+    signing keys by kid, so the endpoint is only hit again once the set's
+    lifespan runs out or a token names a kid it hasn't seen.
+    """
+    return jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=3600, timeout=10)
+
 
 class ClerkJWTAuthentication(authentication.BaseAuthentication):
     """
@@ -25,24 +91,17 @@ class ClerkJWTAuthentication(authentication.BaseAuthentication):
             return None
         
         try:
-            # Decode the JWT token
-            # In production, you should verify with Clerk's public key
-            if settings.CLERK_PEM_PUBLIC_KEY:
-                payload = jwt.decode(
-                    token,
-                    settings.CLERK_PEM_PUBLIC_KEY,
-                    algorithms=['RS256'],
-                    options={'verify_aud': False}
-                )
-            else:
-                # For development, decode without verification
-                payload = jwt.decode(
-                    token,
-                    options={'verify_signature': False}
-                )
+            payload = get_cached_token_payload(token)
+            if payload is None:
+                payload = self.decode_token(token)
+                # Only tokens that decoded successfully reach the cache
+                _cache_token_payload(token, payload)
             
             # Get or create user from Clerk data
             user = User.get_or_create_from_clerk(payload)
+            # The row was just read for this request; later privilege checks
+            # don't need to reload it
+            mark_user_privileges_fresh(user)
             
             return (user, token)
             
@@ -52,4 +111,26 @@ class ClerkJWTAuthentication(authentication.BaseAuthentication):
             raise AuthenticationFailed(f'Invalid token: {str(e)}')
         except Exception as e:
             raise AuthenticationFailed(f'Authentication error: {str(e)}')
-
+    
+    @staticmethod
+    def decode_token(token):
+        """
+        Decode the JWT token, verifying it with Clerk's static public key or,
+        failing that, the signing key published at CLERK_JWKS_URL.
+        """
+        if settings.CLERK_PEM_PUBLIC_KEY:
+            key = _load_public_key(settings.CLERK_PEM_PUBLIC_KEY)
+        elif settings.CLERK_JWKS_URL:
+            key = _get_jwk_client(settings.CLERK_JWKS_URL).get_signing_key_from_jwt(token).key
+        else:
+            # For development, decode without verification
+            return jwt.decode(
+                token,
+                options={'verify_signature': False}
+            )
+        return jwt.decode(
+            token,
+            key,
+            algorithms=['RS256'],
+            options={'verify_aud': False}
+        )
@@ -10,6 +10,9 @@ from django.db import transaction
 from users.models import User
 import re
 
+# Number of users read per page of the scan
+SCAN_PAGE_SIZE = 2000
+
 
 class Command(BaseCommand):
     help = 'Fix existing users by generating proper usernames and ensuring emails are set'
@@ -39,17 +42,23 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('Starting user fix process...'))
         self.stdout.write('')
         
-        # Get all users
-        users = User.objects.all()
+        # Get all users; only the columns the checks read are loaded, and rows are
+        # read a page at a time so memory stays flat however many users there are
+        users = User.objects.only('id', 'username', 'email', 'clerk_id', 'first_name', 'last_name')
         total_users = users.count()
         updated_count = 0
         skipped_count = 0
+        # Each page's changes are written with bulk_update() in their own short
+        # transaction once the page is checked (no cursor is open by then, which
+        # SQLite needs); new usernames handed out are reserved until written
+        to_update = []
+        claimed_usernames = set()
         
         self.stdout.write(f'Found {total_users} users to check')
         self.stdout.write('')
         
-        with transaction.atomic():
-            for user in users:
+        for page in self._iter_pages(users):
+            for user in page:
                 if verbose:
                     self.stdout.write(f'Checking User ID {user.id}:')
                     self.stdout.write(f'  Username: "{user.username}"')
@@ -63,24 +72,25 @@ class Command(BaseCommand):
                 old_email = user.email
                 new_username = None
                 new_email = None
-                
+            
                 # Check if username needs fixing (starts with 'user_' or is the clerk_id)
                 # Also check if username looks like a Clerk ID (long alphanumeric string)
-                is_clerk_id_like = user.clerk_id and (
-                    user.username == user.clerk_id or
-                    (len(user.username) > 20 and user.clerk_id in user.username)
+                clerk_id = user.clerk_id
+                is_clerk_id_like = bool(clerk_id) and (
+                    old_username == clerk_id or
+                    (len(old_username) > 20 and clerk_id in old_username)
                 )
-                
+            
                 username_needs_fix = (
-                    user.username.startswith('user_') or 
+                    old_username.startswith('user_') or 
                     is_clerk_id_like or
                     (force and not user.email and not user.first_name and not user.last_name)
                 )
-                
+            
                 if verbose:
                     self.stdout.write(f'  Username needs fix: {username_needs_fix}')
                     self.stdout.write(f'  Is clerk_id-like: {is_clerk_id_like}')
-                
+            
                 # Generate new username if needed
                 if username_needs_fix:
                     if user.email:
@@ -89,7 +99,7 @@ class Command(BaseCommand):
                     elif user.first_name or user.last_name:
                         # Try to generate from name
                         new_username = User.generate_username_from_name(user.first_name, user.last_name)
-                    
+                
                     # If we still don't have a username and user has a clerk_id,
                     # create a shorter, cleaner version
                     if not new_username and user.clerk_id:
@@ -98,28 +108,31 @@ class Command(BaseCommand):
                         clean_id = user.clerk_id.replace('user_', '')[:15]
                         # Create a username like "user_abc123" instead of full clerk_id
                         new_username = f"user_{clean_id}"
-                    
+                
                     if new_username:
                         # Ensure it's unique
-                        new_username = User.generate_unique_username(new_username)
+                        new_username = User.generate_unique_username(
+                            new_username, exclude_pk=user.pk, reserved=claimed_usernames
+                        )
                         if new_username != user.username:
+                            claimed_usernames.add(new_username)
                             needs_update = True
-                
+            
                 # Check if email is missing but we might be able to infer it
                 # (In a real scenario, you might want to fetch from Clerk API)
                 if not user.email and user.username and '@' in user.username:
                     # Sometimes email might be in username
                     new_email = user.username
                     needs_update = True
-                
+            
                 if needs_update:
                     if not dry_run:
                         if new_username and new_username != user.username:
                             user.username = new_username
                         if new_email and new_email != user.email:
                             user.email = new_email
-                        user.save()
-                    
+                        to_update.append(user)
+                
                     updated_count += 1
                     self.stdout.write(
                         self.style.WARNING(f'User ID {user.id}:')
@@ -134,6 +147,11 @@ class Command(BaseCommand):
                     if verbose:
                         self.stdout.write(f'  No changes needed for User ID {user.id}')
                         self.stdout.write('')
+            
+            if to_update:
+                self._write_batch(to_update)
+                to_update = []
+                claimed_usernames.clear()
         
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -146,17 +164,32 @@ class Command(BaseCommand):
         
         # Show users that still need manual attention
         from django.db.models import Q
-        problem_users = User.objects.filter(
+        problem_count = User.objects.filter(
             Q(email__isnull=True) | Q(email='') | Q(username__startswith='user_')
-        ).distinct()
+        ).count()
         
-        if problem_users.exists():
+        if problem_count:
             self.stdout.write('')
-            self.stdout.write(self.style.WARNING(f'⚠️  {problem_users.count()} user(s) still need attention:'))
+            self.stdout.write(self.style.WARNING(f'⚠️  {problem_count} user(s) still need attention:'))
             self.stdout.write(self.style.WARNING('   - Missing email addresses'))
             self.stdout.write(self.style.WARNING('   - Auto-generated usernames'))
             self.stdout.write(self.style.WARNING('   These will be fixed automatically when users log in next time'))
             self.stdout.write(self.style.WARNING('   (if Clerk provides their email in the JWT token)'))
         
         self.stdout.write(self.style.SUCCESS('=' * 50))
-
+    
+    @staticmethod
+    def _iter_pages(users):
+        """Yield users in pages keyed on pk, each fetched in full before it is yielded."""
+        last_pk = 0
+        while True:
+            page = list(users.filter(pk__gt=last_pk).order_by('pk')[:SCAN_PAGE_SIZE])
+            if not page:
+                return
+            yield page
+            last_pk = page[-1].pk
+    
+    @staticmethod
+    def _write_batch(users):
+        with transaction.atomic():
+            User.objects.bulk_update(users, ['username', 'email'], batch_size=1000)
@@ -1,15 +1,49 @@
-import jwt
+import base64
+import json
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
-from django.utils.deprecation import MiddlewareMixin
+from .authentication import get_cached_token_payload
 
 
-class ClerkJWTAuthMiddleware(MiddlewareMixin):
+def _decode_unverified_payload(token):
+    """
+    Read the claims segment of a JWT without verifying it. This is all an
+    unverified jwt.decode() amounts to, minus PyJWT's option and algorithm
+    handling.
+    """
+    segment = token.split('.', 2)[1]
+    payload = json.loads(base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4)))
+    if not isinstance(payload, dict):
+        raise ValueError('Token payload is not a JSON object')
+    return payload
+
+
+class ClerkJWTAuthMiddleware:
     """
     Middleware to attach Clerk user data to requests.
     This is optional - the authentication class handles the main logic.
+    The work is plain CPU, so it runs inline under both WSGI and ASGI.
     """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.attach_clerk_user(request)
+        return self.get_response(request)
+    
+    async def __acall__(self, request):
+        self.attach_clerk_user(request)
+        return await self.get_response(request)
     
-    def process_request(self, request):
+    @staticmethod
+    def attach_clerk_user(request):
         auth_header = request.headers.get('Authorization')
         
         if not auth_header:
@@ -22,12 +56,12 @@ class ClerkJWTAuthMiddleware(MiddlewareMixin):
                 request.clerk_user = None
                 return
             
-            # Decode without verification for middleware
-            # Actual verification happens in the authentication class
-            payload = jwt.decode(
-                token,
-                options={'verify_signature': False}
-            )
+            # Reuse the payload if the authentication class has already verified
+            # this token; otherwise decode without verification for middleware
+            # (nothing decoded here is cached)
+            payload = get_cached_token_payload(token)
+            if payload is None:
+                payload = _decode_unverified_payload(token)
             request.clerk_user = payload
             
         except Exception:
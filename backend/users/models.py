@@ -1,9 +1,12 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.text import slugify
 import json
 import re
 
+# Characters not allowed in generated usernames
+_USERNAME_DISALLOWED_RE = re.compile(r'[^a-zA-Z0-9._]')
+
 
 class User(AbstractUser):
     """Custom User model that syncs with Clerk authentication."""
@@ -29,7 +32,7 @@ class User(AbstractUser):
         # Extract the part before @
         username = email.split('@')[0]
         # Remove any non-alphanumeric characters except dots and underscores
-        username = re.sub(r'[^a-zA-Z0-9._]', '', username)
+        username = _USERNAME_DISALLOWED_RE.sub('', username)
         # Limit to 150 characters (Django username max length)
         username = username[:150]
         return username or None
@@ -53,46 +56,42 @@ class User(AbstractUser):
         return username or None
     
     @staticmethod
-    def generate_unique_username(base_username: str) -> str:
-        """Generate a unique username by appending numbers if needed."""
+    def generate_unique_username(base_username: str, exclude_pk=None, reserved=()) -> str:
+        """
+        Generate a unique username by appending numbers if needed.
+        The user with `exclude_pk` (the one being renamed) doesn't count as taken;
+        names in `reserved` (e.g. handed out but not saved yet) do.
+        """
         if not base_username:
             return None
         
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
+        base_username = base_username[:150]
+        # Every candidate starts with this prefix (suffixes go up to "_10000" within
+        # the 150 char limit), so the taken ones are loaded in one query instead of
+        # one exists() per candidate
+        prefix = base_username[:150 - len('_10000')]
+        taken = set(
+            User.objects.filter(username__startswith=prefix)
+            .filter(models.Q(username=base_username) | models.Q(username__regex=r'_[0-9]+$'))
+            .exclude(pk=exclude_pk)
+            .values_list('username', flat=True)
+        )
+        taken.update(reserved)
+        if base_username not in taken:
+            return base_username
+        
+        for counter in range(1, 10001):
             # Append counter, but keep within 150 char limit
             suffix = f"_{counter}"
-            if len(username) + len(suffix) > 150:
-                username = username[:150 - len(suffix)] + suffix
-            else:
-                username = username + suffix
-            counter += 1
-            # Safety check to prevent infinite loop
-            if counter > 10000:
+            username = base_username[:150 - len(suffix)] + suffix
+            if username not in taken:
                 break
         
         return username
     
     @classmethod
-    def get_or_create_from_clerk(cls, clerk_user_data: dict) -> 'User':
-        """
-        Get or create a user from Clerk JWT claims.
-        Generates proper username from email or name, and ensures email is set.
-        """
-        clerk_id = clerk_user_data.get('sub')
-        email = clerk_user_data.get('email', '').strip()
-        first_name = clerk_user_data.get('given_name', '').strip()
-        last_name = clerk_user_data.get('family_name', '').strip()
-        
-        # Try to get existing user
-        user = None
-        try:
-            user = cls.objects.get(clerk_id=clerk_id)
-        except cls.DoesNotExist:
-            pass
-        
-        # Generate username
+    def generate_username_from_clerk(cls, clerk_id: str, email: str, first_name: str, last_name: str, exclude_pk=None) -> str:
+        """Generate a unique username from email, then name, then the Clerk ID."""
         username = None
         if email:
             # First try: username from email
@@ -102,25 +101,46 @@ class User(AbstractUser):
             username = cls.generate_username_from_name(first_name, last_name)
         if not username:
             # Fallback: use a sanitized version of clerk_id
-            username = re.sub(r'[^a-zA-Z0-9._]', '', clerk_id)[:150] if clerk_id else f"user_{clerk_id[:20]}" if clerk_id else None
+            username = _USERNAME_DISALLOWED_RE.sub('', clerk_id)[:150] if clerk_id else f"user_{clerk_id[:20]}" if clerk_id else None
         
         # Ensure username is unique
         if username:
-            username = cls.generate_unique_username(username)
+            username = cls.generate_unique_username(username, exclude_pk)
         
         # If no username could be generated, use clerk_id as last resort
         if not username:
             username = clerk_id or f"user_{clerk_id[:20]}"
-            username = cls.generate_unique_username(username)
+            username = cls.generate_unique_username(username, exclude_pk)
+        
+        return username
+    
+    @classmethod
+    def get_or_create_from_clerk(cls, clerk_user_data: dict) -> 'User':
+        """
+        Get or create a user from Clerk JWT claims.
+        Generates proper username from email or name, and ensures email is set.
+        """
+        clerk_id = clerk_user_data.get('sub')
+        email = clerk_user_data.get('email', '').strip()
+        first_name = clerk_user_data.get('given_name', '').strip()
+        last_name = clerk_user_data.get('family_name', '').strip()
+        
+        # Try to get existing user
+        user = None
+        try:
+            user = cls.objects.get(clerk_id=clerk_id)
+        except cls.DoesNotExist:
+            pass
         
         if user:
             # Update existing user - always try to improve email and username
-            needs_save = False
+            # Only the columns that actually changed are written
+            dirty = []
             
             # Update email if we have one (even if user already has one, Clerk's is more authoritative)
             if email and email != user.email:
                 user.email = email
-                needs_save = True
+                dirty.append('email')
             
             # Update username if it's still auto-generated (starts with 'user_' or equals clerk_id)
             # or if we can generate a better one
@@ -130,23 +150,27 @@ class User(AbstractUser):
                 (clerk_id and clerk_id in user.username)
             )
             
-            if is_auto_generated and username and username != user.username:
-                user.username = username
-                needs_save = True
+            # A better username is only worked out (and checked for uniqueness)
+            # when the current one is auto-generated
+            if is_auto_generated:
+                username = cls.generate_username_from_clerk(clerk_id, email, first_name, last_name, exclude_pk=user.pk)
+                if username and username != user.username:
+                    user.username = username
+                    dirty.append('username')
             
             # Update name fields if provided
             if first_name and first_name != user.first_name:
                 user.first_name = first_name
-                needs_save = True
+                dirty.append('first_name')
             if last_name and last_name != user.last_name:
                 user.last_name = last_name
-                needs_save = True
+                dirty.append('last_name')
             
             # Update avatar if provided
             avatar_url = clerk_user_data.get('picture', '')
             if avatar_url and avatar_url != user.avatar_url:
                 user.avatar_url = avatar_url
-                needs_save = True
+                dirty.append('avatar_url')
             
             # Update admin status - but preserve manual Django admin settings
             # Only update if Clerk explicitly says user should be admin (don't remove admin if set in Django)
@@ -154,23 +178,36 @@ class User(AbstractUser):
             if clerk_admin_status and not user.is_admin:
                 # Clerk says user should be admin, but Django doesn't have it - grant admin
                 user.is_admin = True
-                needs_save = True
+                dirty.append('is_admin')
             # If user is already admin in Django, keep it even if Clerk doesn't say so
             # This preserves manual admin assignments made in Django admin
             
-            if needs_save:
-                user.save()
+            if dirty:
+                user.save(update_fields=dirty)
         else:
-            # Create new user
-            user = cls.objects.create(
-                clerk_id=clerk_id,
-                username=username,
-                email=email,
-                first_name=first_name,
-                last_name=last_name,
-                avatar_url=clerk_user_data.get('picture', ''),
-                is_admin=clerk_user_data.get('public_metadata', {}).get('role') == 'admin',
-            )
+            # Create new user. An IntegrityError means either a concurrent first
+            # request from the same Clerk user (the frontend fires several at
+            # once) created the row first, or another new user just took the
+            # same generated username; the latter gets one retry with a fresh one
+            for attempt in range(2):
+                try:
+                    with transaction.atomic():
+                        user = cls.objects.create(
+                            clerk_id=clerk_id,
+                            username=cls.generate_username_from_clerk(clerk_id, email, first_name, last_name),
+                            email=email,
+                            first_name=first_name,
+                            last_name=last_name,
+                            avatar_url=clerk_user_data.get('picture', ''),
+                            is_admin=clerk_user_data.get('public_metadata', {}).get('role') == 'admin',
+                        )
+                    break
+                except IntegrityError:
+                    user = cls.objects.filter(clerk_id=clerk_id).first()
+                    if user is not None:
+                        break
+                    if attempt:
+                        raise
         
         return user
 
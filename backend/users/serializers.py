@@ -1,7 +1,16 @@
 from rest_framework import serializers
+from core_api.utils import get_user_admin_status
 from .models import User, LeaveSchedule
 
 
+# Columns UserSerializer reads (including the flags behind is_admin), so user
+# lists can skip loading the password hash and the rest of the row
+USER_SERIALIZER_COLUMNS = (
+    'id', 'clerk_id', 'email', 'username', 'first_name', 'last_name',
+    'avatar_url', 'is_admin', 'is_superuser', 'is_staff', 'date_joined',
+)
+
+
 class UserSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     is_admin = serializers.SerializerMethodField()
@@ -25,7 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
     
     def get_is_admin(self, obj):
         """Superusers and staff automatically have admin status in the dashboard."""
-        return obj.is_admin or obj.is_superuser or obj.is_staff
+        return get_user_admin_status(obj)
 
 
 class LeaveScheduleSerializer(serializers.ModelSerializer):
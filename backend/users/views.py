@@ -8,15 +8,16 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.utils import timezone
 import os
+from core_api.utils import validate_hex_color
 from .models import User, UserPreferences, LeaveSchedule
-from .serializers import UserSerializer, LeaveScheduleSerializer
+from .serializers import UserSerializer, LeaveScheduleSerializer, USER_SERIALIZER_COLUMNS
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing users.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.only(*USER_SERIALIZER_COLUMNS)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -181,10 +182,8 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             category_colors = request.data['tools_category_colors']
             if isinstance(category_colors, dict):
                 # Validate that values are valid hex colors
-                import re
-                hex_color_pattern = re.compile(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
                 for key, value in category_colors.items():
-                    if value and not hex_color_pattern.match(str(value)):
+                    if value and not validate_hex_color(value):
                         return Response(
                             {'error': f'Invalid color format for category {key}. Must be a hex color (e.g., "#3B82F6")'},
                             status=status.HTTP_400_BAD_REQUEST
@@ -256,8 +255,6 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                 )
             
             # Validate colors
-            import re
-            hex_color_pattern = re.compile(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
             required_keys = ['background', 'surface', 'surfaceElevated', 'textPrimary', 
                            'textSecondary', 'textTertiary', 'primary', 'primaryHover', 
                            'primaryLight', 'border', 'borderLight', 'success', 
@@ -269,7 +266,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                         {'error': f'Missing required color key: {key}'},
                         status=status.HTTP_400_BAD_REQUEST
                     )
-                if theme_colors[key] and not hex_color_pattern.match(str(theme_colors[key])):
+                if theme_colors[key] and not validate_hex_color(theme_colors[key]):
                     return Response(
                         {'error': f'Invalid color format for {key}. Must be a hex color (e.g., "#3B82F6")'},
                         status=status.HTTP_400_BAD_REQUEST
@@ -317,8 +314,6 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             custom_colors = request.data['custom_theme_colors']
             if isinstance(custom_colors, dict):
                 # Validate that values are valid hex colors
-                import re
-                hex_color_pattern = re.compile(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
                 required_keys = ['background', 'surface', 'surfaceElevated', 'textPrimary', 
                                'textSecondary', 'textTertiary', 'primary', 'primaryHover', 
                                'primaryLight', 'border', 'borderLight', 'success', 
@@ -331,7 +326,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                             {'error': f'Missing required color key: {key}'},
                             status=status.HTTP_400_BAD_REQUEST
                         )
-                    if custom_colors[key] and not hex_color_pattern.match(str(custom_colors[key])):
+                    if custom_colors[key] and not validate_hex_color(custom_colors[key]):
                         return Response(
                             {'error': f'Invalid color format for {key}. Must be a hex color (e.g., "#3B82F6")'},
                             status=status.HTTP_400_BAD_REQUEST
@@ -5,6 +5,7 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from core_api.permissions import IsAdminOrReadOnly
+from core_api.utils import get_request_admin_status
 from .models import Document
 from .serializers import DocumentSerializer, DocumentUploadRequestSerializer
 
@@ -44,7 +45,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         
         # Check admin permission for uploads
-        if not (request.user.is_admin or request.user.is_superuser or request.user.is_staff):
+        if not get_request_admin_status(request):
             return Response(
                 {'error': 'Only admins can upload documents'},
                 status=status.HTTP_403_FORBIDDEN
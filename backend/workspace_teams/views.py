@@ -7,8 +7,9 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from core_api.permissions import IsAdminOrReadOnly, IsAuthenticatedOrReadOnlyInDebug
+from core_api.utils import get_request_admin_status
 from users.models import User
-from users.serializers import UserSerializer
+from users.serializers import UserSerializer, USER_SERIALIZER_COLUMNS
 from .models import Team, TeamMember, TeamInvite, TeamJoinRequest
 from .serializers import TeamSerializer, TeamMemberSerializer, TeamInviteSerializer, TeamJoinRequestSerializer
 
@@ -58,7 +59,7 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def list_all(self, request):
         """Get all team members (users in the system)."""
-        users = User.objects.all()
+        users = User.objects.only(*USER_SERIALIZER_COLUMNS)
         serializer = UserSerializer(users, many=True)
         return Response(serializer.data)
     
@@ -304,7 +305,7 @@ class TeamJoinRequestViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter join requests based on user role."""
         user = self.request.user
-        if user.is_admin or user.is_superuser or user.is_staff:
+        if get_request_admin_status(self.request):
             # Admins can see all pending requests for teams they admin
             admin_teams = Team.objects.filter(members__user=user, members__role='admin')
             return TeamJoinRequest.objects.filter(team__in=admin_teams, status='pending')